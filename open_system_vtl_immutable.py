@@ -1,25 +1,50 @@
 #!usr/bin/python
 import json
+import re
 import sys
 import os
-import base64
-import yaml
-from datetime import datetime, timedelta
-import urllib3
-import paramiko
+import time
+from datetime import datetime
 import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
 
 import utils
-from utils import log_message, validate_yaml_file, get_input_parameters, decrypt_credentials, execute_ssh_command, \
-    size_to_bytes, generate_report_rl
+from utils import log_message, log_debug, validate_yaml_file, get_input_parameters, decrypt_credentials, size_to_bytes, \
+    generate_report_rl, tape_time_epoch, split_columns, iter_tape_rows, TapeInfo, tapes_to_json, \
+    is_retention_locked, is_vtl_available, flush_reports, execute_ssh_command, execute_ssh_batch, drop_ssh_transport, \
+    SSH_MAX_SESSIONS
 
 full_path = os.path.abspath(os.path.dirname(__file__))
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 DATE = datetime.now().strftime("%d_%m_%Y")
 LOGFILE = f"./script_{DATE}.log"
 LOGSFOLDER = "./logs/"
 
+# (attribute, YAML parameter) pairs that validate_input_parameters requires
+REQUIRED_PARAMETERS = (
+    ('instance', 'open_system_instance'),
+    ('pool', 'pool_name'),
+    ('cred_file', 'open_system_credential_file_path'),
+    ('minimum_tape_usage', 'minimum_tape_usage'),
+    ('mechanism', 'execution_logic_mechanism'),
+)
+
+# Tapes are locked concurrently over channels of the pooled SSH connection (--workers, 1 to SSH_MAX_SESSIONS).
+# More concurrency (e.g. an asyncio channel per tape) would only wait for a free session, so every worker drives
+# a whole batch of tapes through one channel instead
+
+# command sent for every tape of a batch, the template is built once
+TAPE_RETENTION_LOCK_COMMAND = "vtl tape modify %s pool %s retention-lock %s"
+# the DD CLI prints its error messages with a leading "**"; the shell channel has no separate error output
+DD_CLI_ERROR = re.compile(r"^\s*\*\*", re.M)
+
+# one column of the tab separated filesys report, without the padding around it
+REPORT_COLUMN = re.compile(r"[^\t\s](?:[^\t]*[^\t\s])?")
+
+# Alphanumeric runs of a report file name; the tape barcode is one of them, wherever it sits in the path
+BARCODE_TOKEN = re.compile(r"[A-Za-z0-9]+")
+
 
 class OpenSystem():
     # __init__ is a special method called whenever you try to make
@@ -39,6 +64,10 @@ class OpenSystem():
         self.pool_retention_lock_enabled = False
         self.tape_list = []
         self.report = []
+        self._report_by_barcode = {}
+        self._pool_snapshot = {}
+        self._today_epoch = 0
+        self._yesterday_epoch = 0
 
         self.retention_lock_period_for_tapes_in_days = 0
         self.retention_lock_period_for_tapes_for_monthly_in_years = 0
@@ -50,8 +79,10 @@ class OpenSystem():
         self.maximum_retention_lock_period_monthly_backup_in_years = 0
 
         self.minimum_tape_usage = None
+        self._min_tape_usage_bytes = 0
+        self._retention_lock_period = None
         self.log_message = log_message
-        self.execute_ssh_command = execute_ssh_command
+        self.ssh_workers = SSH_MAX_SESSIONS
 
     def validate_yaml_file(self, file):
         """
@@ -75,7 +106,8 @@ class OpenSystem():
         Required: None
         Returns: None
 
-        - Reads the YAML file and assigns values to class attributes.
+        - Reads the YAML file (or its '<file>.cache.json' cache while the file is unchanged) and assigns values to
+          class attributes.
         - Logs and exits the program if there is an error while loading parameters.
         """
 
@@ -115,36 +147,24 @@ class OpenSystem():
             If any required parameter is missing, it logs an error message and stops the execution.
         """
 
-        # Check if 'open_system_instance' parameter is provided
-        if self.instance == None:
-            # Log an error message specifying the missing parameter and the file name, then exit the program
-            self.log_message(f"'open_system_instance' parameter is missing on {self.input_parameters_file} file")
-            sys.exit(1)
-
-        # Check if 'pool_name' parameter is provided
-        if self.pool == None:
-            # Log an error message specifying the missing parameter and the file name, then exit the program
-            self.log_message(f"'pool_name' parameter is missing on {self.input_parameters_file} file")
-            sys.exit(1)
-
-        # Check if 'open_system_credential_file_path' parameter is provided
-        if self.cred_file == None:
-            # Log an error message specifying the missing parameter and the file name, then exit the program
+        # Check that every required parameter is provided, and report all missing ones at once
+        missing_parameters = [f"'{parameter}'" for attribute, parameter in REQUIRED_PARAMETERS
+                              if getattr(self, attribute) is None]
+        if missing_parameters:
+            # Log an error message specifying the missing parameters and the file name, then exit the program
             self.log_message(
-                f"'open_system_credential_file_path' parameter missing on {self.input_parameters_file} file")
+                f"{', '.join(missing_parameters)} parameter missing on {self.input_parameters_file} file")
             sys.exit(1)
 
-        # Check if 'minimum_tape_usage' parameter is provided
-        if self.minimum_tape_usage == None:
-            # Log an error message specifying the missing parameter and the file name, then exit the program
-            self.log_message(f"'minimum_tape_usage' parameter missing on {self.input_parameters_file} file")
+        # 'minimum_tape_usage' never changes during a run, convert it to bytes once
+        try:
+            self._min_tape_usage_bytes = size_to_bytes(self.minimum_tape_usage)
+        except (ValueError, AttributeError) as e:
+            self.log_message(f"'minimum_tape_usage' parameter is invalid on {self.input_parameters_file} file: {e}")
             sys.exit(1)
 
-        # Check if 'execution_logic_mechanism' parameter is provided
-        if self.mechanism == None:
-            # Log an error message specifying the missing parameter and the file name, then exit the program
-            self.log_message(f"'execution_logic_mechanism' parameter missing on {self.input_parameters_file} file")
-            sys.exit(1)
+        # the tape retention lock period is the same for every tape, derive it once
+        self._retention_lock_period = self.get_retention_lock_period()
 
         self.log_message("input parameters from YAML file has been loaded")
 
@@ -161,6 +181,24 @@ class OpenSystem():
            """
         self.user, self.password = decrypt_credentials(self.cred_file)
 
+    def _run(self, command):
+        """
+        Method: _run
+        Description: This method executes a command on the OpenSystem instance over the pooled SSH connection.
+        Required: command (str) - The command to execute
+        Returns: str or bool (The command output if successful, False otherwise)
+        """
+        return execute_ssh_command(command, self.instance, self.user, self.password)
+
+    def close(self):
+        """
+        Method: close
+        Description: This method closes the pooled SSH connection to the OpenSystem instance, if one is open.
+        Required: None
+        Returns: None
+        """
+        drop_ssh_transport(self.instance, self.user)
+
     def check_vtl_state(self):
         """
         Method: check_vtl_state
@@ -172,9 +210,9 @@ class OpenSystem():
         self.log_message(f"OpenSystem: {self.instance} Checking VTL state...")
         command = "vtl status"
         self.log_message(f"[Executing Command]: {command}")
-        vtl_status = self.execute_ssh_command(command, self.instance, self.user, self.password)
+        vtl_status = self._run(command)
 
-        if vtl_status and "enabled" in vtl_status and "running" in vtl_status and "licensed" in vtl_status:
+        if vtl_status and is_vtl_available(vtl_status):
             self.log_message(f"VTL is enabled, running, and licensed.")
             self.VTL_STATUS = True
 
@@ -187,83 +225,32 @@ class OpenSystem():
         Returns: None (Logs the filtered list of tapes and stores it in the instance's tape_list attribute)
         """
         vtl_pool_name = self.pool
-        mechanism = self.mechanism
+        self.set_reference_dates()
         self.log_message(f"Fetching Pool: {vtl_pool_name} Tape list...")
 
         command = f"vtl tape show pool {vtl_pool_name} sort-by modtime descending"
         self.log_message(f"[Executing Command]: {command}")
 
-        pool_data = self.execute_ssh_command(command, self.instance, self.user, self.password)
+        pool_data = self._run(command)
         # print(pool_data)
         # exit(1)
         if not pool_data:
             self.log_message(f"Failed to retrieve Pool: {vtl_pool_name} details.")
             return []
 
-        heading = ['Processing tapes....', 'Barcode', 'Pool', 'Location', 'State', 'Size', 'Used (%)', 'Comp',
-                   'Modification Time',
-                   'Total size of tapes:', 'Total pools:', 'Total number of tapes:', 'Average Compression:'
-                                                                                     '--------',
-                   ' --------------------', ' -----------------------', ' -----', ' --------', ' ----------------',
-                   ' ----', ' -------------------'
-                   ]
         tape_list = []
         try:
-            for line in pool_data.split("\n"):
-
-                line = line.split('  ')
-
-                if line[0].strip() == '':
-                    continue
-                # print(line)
-                # Check if any element in the array contains a dash '-'
-                # remove_dash = any('-' in item for item in line)
-
-                # if remove_dash:
-                #    continue
-
-                # print(line)
-                # Check if any element in the array contains a dash 'Barcode'
-                # remove_heading = True if line[0].strip() in heading else False
-                remove_heading = set(line) & set(heading)
-
-                if remove_heading:
-                    continue
-
-                if len(line) < 2:
-                    continue
-                # print(line)
-                tapes = []
-
-                for tape_data in line:
-                    tape_data = tape_data.strip()
-                    if tape_data:
-                        tapes.append(tape_data)
-
-                if len(tapes) == 8:
-
-                    tape_info = {
-                        "barcode": tapes[0],
-                        "pool_name": tapes[1],
-                        "location": tapes[2],
-                        "state": tapes[3],
-                        "size": tapes[4],
-                        "used": tapes[5],
-                        "modification_time": tapes[7]
-                    }
-                    # print(tape_info)
-                    used = self.check_used(tape_info)
-                    state = self.check_state(tape_info)
-                    last_modified = self.check_modification_date(tape_info, mechanism)
-
-                    if "slot" in tape_info["location"] and used and state and last_modified:
-                        tape_list.append(tape_info)
+            for tapes in iter_tape_rows(pool_data):
+                tape_info = TapeInfo.from_columns(tapes)
+                if self._accept_tape(tape_info):
+                    tape_list.append(tape_info)
         except Exception as e:
             self.log_message(str(e))
 
         self.log_message(
             "=======================================Begins RL for Below Barcodes===========================================")
-        self.log_message(json.dumps(tape_list, indent=4))
+        self.log_message(f"{len(tape_list)} tapes selected for Retention Lock")
+        log_debug(lambda: tapes_to_json(tape_list))
         print("length::", len(tape_list))
         self.log_message(
             "========================================================================================================================")
@@ -273,48 +260,18 @@ class OpenSystem():
     def format_tape_data(self, pool_data):
         """
             Method: format_tape_data
-            Description: This method formats the raw pool data received from a command into a structured list of dictionaries,
+            Description: This method formats the raw pool data received from a command into TapeInfo objects,
                          each representing tape information like barcode, pool name, state, size, used status, and modification time.
+                         The objects are yielded one row at a time, so the caller can index them without an intermediate list.
             Required: pool_data (raw data string representing tape information)
-            Returns: List of dictionaries, each containing structured tape information.
+            Returns: Generator of TapeInfo objects, each containing structured tape information.
         """
-        tape_list = []
-        i = 0
         try:
-            for line in pool_data.split("\n"):
-                # parts = line.split()
-                line = line.split('  ')
-
-                i += 1
-                hyphen = line[0].count('-', 0, 2)
-
-                if i > 3 and hyphen > 1:
-                    break
-                if i <= 3:
-                    continue
-
-                tapes = []
-
-                for tape_data in line:
-                    tape_data = tape_data.strip()
-                    if tape_data:
-                        tapes.append(tape_data)
-
-                tape_list.append(
-                    {
-                        "barcode": tapes[0],
-                        "pool_name": tapes[1],
-                        "state": tapes[3],
-                        "size": tapes[4],
-                        "used": tapes[5],
-                        "modification_time": tapes[7]
-                    }
-                )
+            for tapes in iter_tape_rows(pool_data):
+                yield TapeInfo.from_columns(tapes)
         except Exception as e:
             self.log_message(e)
 
-        return tape_list
-
     def check_pool_retention_lock_governance_mode(self):
         """
         Method: check_pool_retention_lock_governance_mode
@@ -326,30 +283,25 @@ class OpenSystem():
         self.log_message(f"Checking Retention Lock Governance Mode for MTREE /data/col1/{pool}")
         command = f"mtree retention-lock status mtree /data/col1/{pool}"
         self.log_message(f"[Executing Command]: {command}")
-        data = self.execute_ssh_command(command, self.instance, self.user, self.password)
+        data = self._run(command)
 
         i = 0
         retention_lock = False
         retention_lock_mode = None
         try:
-            for line in data.split("\n"):
-                # parts = line.split()
-                line = line.split('  ')
+            for line in data.splitlines():
+                arr = split_columns(line)
 
                 i += 1
-                hyphen = line[0].count('-', 0, 2)
-
-                if i > 2 and hyphen > 1:
-                    break
                 if i <= 2:
                     continue
+                if not arr:
+                    continue
+                if arr[0].startswith('--'):
+                    break
 
-                arr = []
-                for mtree_data in line:
-                    if mtree_data.strip() != "":
-                        arr.append(mtree_data)
-                option = arr[0].strip()
-                value = arr[1].strip()
+                option = arr[0]
+                value = arr[1]
                 if option == "Retention-lock" and value == "enabled":
                     retention_lock = True
                 elif option == "Retention-lock mode" and value == "governance":
@@ -378,7 +330,7 @@ class OpenSystem():
             self.log_message(f"Enabling Retention Lock Governance Mode on MTREE /data/col1/{pool}")
             command = f"mtree retention-lock enable mode governance mtree /data/col1/{pool}"
             self.log_message(f"[Executing Command]: {command}")
-            data = self.execute_ssh_command(command, self.instance, self.user, self.password)
+            data = self._run(command)
             self.log_message(f"{data}")
             if data == False:
                 self.pool_retention_lock_enabled = False
@@ -414,7 +366,7 @@ class OpenSystem():
             if retention_lock:
                 command = f"mtree retention-lock set min-retention-period {retention_lock} mtree  /data/col1/{pool}"
                 self.log_message(f"[Executing Command]: {command}")
-                result = self.execute_ssh_command(command, self.instance, self.user, self.password)
+                result = self._run(command)
                 self.log_message(result)
             else:
                 self.log_message(f"unable to set minimun retention lock {retention_lock} mtree  /data/col1/{pool}")
@@ -443,28 +395,11 @@ class OpenSystem():
             if retention_lock:
                 command = f"mtree retention-lock set max-retention-period {retention_lock} mtree /data/col1/{pool}"
                 self.log_message(f"[Executing Command]: {command}")
-                result = self.execute_ssh_command(command, self.instance, self.user, self.password)
+                result = self._run(command)
                 self.log_message(result)
             else:
                 self.log_message(f"unable to set maximum retention lock {retention_lock} mtree  /data/col1/{pool}")
 
-    def check_used(self, tape_info):
-        """
-        Method: check_used
-        Description: This method checks if the tape's usage percentage is greater than 0. If the usage is greater than 0 or if the tape is found to be used in the report, it returns True. Otherwise, it returns False.
-        Required: tape_info (contains information about the tape including the usage)
-        Returns: Boolean (True if the tape usage is > 0 or it is marked as used in the report, False otherwise)
-        """
-        # self.log_message(f"Checking USED%>0 for Bardcode: {tape_info['barcode']} used: {tape_info['used']}")
-        used = tape_info["used"]
-        used = used.split()
-        used = float(used[0])
-        check_usage_in_report = self.check_usage_in_report(tape_info)
-        if used > 0 or check_usage_in_report == True:
-            return True
-        else:
-            return False
-
     def generate_filesys_report(self):
         """
         Method: generate_filesys_report
@@ -478,29 +413,20 @@ class OpenSystem():
         command = f"filesys report generate file-location path /data/col1/{vtl_pool_name}"
         self.log_message(f"[Executing Command]: {command}")
 
-        report = self.execute_ssh_command(command, self.instance, self.user, self.password)
+        report = self._run(command)
 
         tape_list = []
         i = 0
         try:
             for line in report.split("\n"):
-                # parts = line.split()
-                line = line.split('\t')
-
                 i += 1
-                hyphen = line[0].count('-', 0, 2)
-
-                if i > 3 and hyphen > 1:
+                if i > 3 and line.startswith('--'):
                     break
                 if i <= 3:
                     continue
 
-                tape = []
-
-                for tape_data in line:
-                    tape_data = tape_data.strip()
-                    if tape_data:
-                        tape.append(tape_data)
+                # the stripped, non-empty tab separated columns in one findall
+                tape = REPORT_COLUMN.findall(line)
 
                 tape_list.append({
                     "file_name": tape[0],
@@ -512,61 +438,43 @@ class OpenSystem():
 
         self.report = tape_list
 
+        # index the report by every alphanumeric token of the file name in a single pass, so each tape is
+        # looked up in O(1) whether its barcode is a path component or part of one (e.g. <barcode>.tape)
+        report_by_barcode = {}
+        for tape in tape_list:
+            for token in BARCODE_TOKEN.findall(tape["file_name"]):
+                report_by_barcode.setdefault(token, tape)
+        self._report_by_barcode = report_by_barcode
+
         self.log_message(
             f"=======================================Genearated Report MTREE /data/col1/{self.pool}===========================================")
-        self.log_message(json.dumps(tape_list, indent=4))
+        self.log_message(f"{len(tape_list)} files in the report")
+        log_debug(lambda: json.dumps(tape_list, indent=4))
         self.log_message(
             "========================================================================================================================")
 
     def check_usage_in_report(self, tape_info):
         """
         Method: check_usage_in_report
-        Description: This method checks if a specific tape's size is larger than the defined reference size (minimum tape usage),
-                     and compares the tape's modification date with the placement time recorded in the report.
-                     Returns True if both the size condition and modification time match, otherwise returns False.
-        Required: tape_info (a dictionary containing tape information, e.g., barcode and modification_time)
+        Description: This method checks if a specific tape's size recorded in the filesys report is larger than the
+                     defined reference size (minimum tape usage).
+                     Returns True if the size condition matches, otherwise returns False.
+        Required: tape_info (TapeInfo object containing tape information, e.g., barcode)
         Returns: Boolean value (True or False)
         """
         try:
-            tape_report_data = None
-            if len(self.report) > 0:
-                for tape in self.report:
-                    if tape_info["barcode"] in tape["file_name"]:
-                        tape_report_data = tape
-                        break
+            tape_report_data = self._report_by_barcode.get(tape_info.barcode)
 
             if tape_report_data:
-                self.log_message(f"Checking minimum usage for Barcode: {tape_info['barcode']}")
-                # Reference size in GiB
-                reference_size_gb = self.minimum_tape_usage
-                reference_size_in_bytes = size_to_bytes(reference_size_gb)
+                self.log_message("Checking minimum usage for Barcode: %s", tape_info.barcode)
+                # Reference size converted once by validate_input_parameters
+                reference_size_in_bytes = self._min_tape_usage_bytes
 
                 # Convert file size to bytes
                 file_size_in_bytes = size_to_bytes(tape_report_data["size"])
 
                 if file_size_in_bytes > reference_size_in_bytes:
-
-                    modified_date = datetime.strptime(tape_info["modification_time"], '%Y/%m/%d %H:%M:%S')
-
-                    # Get the date part only (2023/12/04) and set the time to 12:00 AM (midnight)
-                    t_stamp = modified_date.replace(hour=0, minute=0, second=0, microsecond=0)
-
-                    modified_date_timestamp = int(t_stamp.timestamp())
-
-                    # Convert the string to a datetime object
-                    report_placement_time = datetime.strptime(tape_report_data["placement_time"],
-                                                              "%a %b %d %H:%M:%S %Y")
-
-                    # Format the datetime object to dd-mm-yyyy
-                    formatted_placement_time = report_placement_time.replace(hour=0, minute=0, second=0, microsecond=0)
-
-                    # Convert the datetime object to a timestamp
-                    midnight_dt_object = int(formatted_placement_time.timestamp())
-
-                    if modified_date_timestamp == midnight_dt_object:
-                        return True
-                    else:
-                        return True
+                    return True
                 else:
                     return False
             else:
@@ -574,71 +482,59 @@ class OpenSystem():
         except Exception as e:
             self.log_message(e)
 
-    def check_state(self, tape_info):
+    def set_reference_dates(self):
         """
-        Method: check_state
-        Description: This method checks if the tape is in Retention Lock (RL) mode. If the tape is in RL mode, it returns False to exclude it from further processing. Otherwise, it returns True.
-        Required: tape_info (contains information about the tape including its state)
-        Returns: Boolean (True if the tape is not in Retention Lock mode, False otherwise)
+        Method: set_reference_dates
+        Description: This method computes the midnight epoch timestamps of today and yesterday once per run, so
+                     _accept_tape only has to compare integers for every tape.
+        Required: None
+        Returns: None (Stores the timestamps in the instance's _today_epoch and _yesterday_epoch attributes)
         """
-        # self.log_message(f"checking STATE for Bardcode: {tape_info['barcode']} state:{tape_info['state']}")
-        state = tape_info["state"]
-        state = state.strip()
-        if "RL" in state:
-            # self.log_message(f"Bardcode: {tape_info['barcode']} state:{tape_info['state']} Retention-Lock already set")
-            return False
-        else:
-            return True
+        # Midnight (12:00 AM) of today and yesterday; mktime normalizes day 0 to the last day of the previous
+        # month and resolves DST, so no datetime arithmetic is needed
+        year, month, day = time.localtime()[:3]
+
+        self._today_epoch = int(time.mktime((year, month, day, 0, 0, 0, 0, 0, -1)))
+        self._yesterday_epoch = int(time.mktime((year, month, day - 1, 0, 0, 0, 0, 0, -1)))
 
-    def check_modification_date(self, tape_info, mechanism):
+    def _accept_tape(self, tape_info):
         """
-        Method: check_modification_date
-        Description: This method checks the modification date of the tape against the current date and yesterday's date. It validates the modification date based on the specified mechanism:
+        Method: _accept_tape
+        Description: This method decides in a single short-circuit pass whether a tape qualifies for Retention Lock,
+                     parsing each field only once and running the cheapest checks first:
+                     - The tape should be in a slot.
+                     - The tape should not be in Retention Lock (RL) mode already.
                      - Mechanism 1: The tape should have been modified today.
                      - Mechanism 2: The tape should have been modified yesterday.
-        Required: tape_info (contains modification date of the tape), mechanism (integer value to determine the date comparison)
-        Returns: Boolean (True if the modification date matches the expected date based on the mechanism, False otherwise)
+                     - The tape usage should be > 0, or the tape should be large enough in the filesys report.
+        Required: tape_info (contains location, state, modification date and usage of the tape)
+        Returns: Boolean (True if the tape qualifies for Retention Lock, False otherwise)
         """
-
-        modified_date = datetime.strptime(tape_info["modification_time"], '%Y/%m/%d %H:%M:%S')
-
-        # self.log_message(f"checking LAST MODIFIED Barcode: {tape_info['barcode']} {tape_info['modification_time']} and Mechanism #{mechanism}")
-
-        # Get the date part only (2023/12/04) and set the time to 12:00 AM (midnight)
-        t_stamp = modified_date.replace(hour=0, minute=0, second=0, microsecond=0)
-
-        modified_date_timestamp = int(t_stamp.timestamp())
-
-        # todays date
-        current_date = datetime.now()
-
-        # Get the date part only (2023/12/04) and set the time to 12:00 AM (midnight)
-        midnight_dt_object = current_date.replace(hour=0, minute=0, second=0, microsecond=0)
-
-        current_date_epoch_timestamp = int(midnight_dt_object.timestamp())
-
-        yesterday = (datetime.now() - timedelta(1)).strftime('%Y/%m/%d %H:%M:%S')
-
-        dt_object = datetime.strptime(yesterday, '%Y/%m/%d %H:%M:%S')
+        if "slot" not in tape_info.location or is_retention_locked(tape_info.state):
+            return False
 
         # Get the date part only (2023/12/04) and set the time to 12:00 AM (midnight)
-        midnight_dt_object = dt_object.replace(hour=0, minute=0, second=0, microsecond=0)
-
-        yesterday_epoch_timestamp = int(midnight_dt_object.timestamp())
+        modified_date_timestamp = tape_time_epoch(tape_info.modification_time, date_only=True)
 
-        if current_date_epoch_timestamp == modified_date_timestamp and mechanism == 1:
-            return True
-        elif yesterday_epoch_timestamp == modified_date_timestamp and mechanism == 2:
-            return True
+        if self.mechanism == 1:
+            expected_date_timestamp = self._today_epoch
+        elif self.mechanism == 2:
+            expected_date_timestamp = self._yesterday_epoch
         else:
             return False
 
-    def set_retention_lock(self, tape_info):
+        if modified_date_timestamp != expected_date_timestamp:
+            return False
+
+        used = float(tape_info.used.split()[0])
+        return used > 0 or self.check_usage_in_report(tape_info) == True
+
+    def get_retention_lock_period(self):
         """
-        Method: set_retention_lock
-        Description: This method sets the retention lock on a tape in the specified pool. The retention lock period is determined based on daily or monthly backup settings.
-        Required: tape_info (contains information about the tape including barcode and pool name), retention_lock_period (calculated retention lock period)
-        Returns: Boolean (True if retention lock was successfully applied and the tape state is updated to "RO/RL*", False otherwise)
+        Method: get_retention_lock_period
+        Description: This method determines the retention lock period of the tapes based on daily or monthly backup settings.
+        Required: retention_lock_period_for_tapes_in_days or retention_lock_period_for_tapes_for_monthly_in_years
+        Returns: str or None (The retention lock period, e.g. "30day" or "7year", None if none is configured)
         """
         retention_lock_period = None
 
@@ -651,30 +547,49 @@ class OpenSystem():
                 int) and self.retention_lock_period_for_tapes_for_monthly_in_years > 0:
             retention_lock_period = str(self.retention_lock_period_for_tapes_for_monthly_in_years) + "year"
 
-        if retention_lock_period:
-            self.log_message(
-                f"Setting Retention Lock on Barcode: {tape_info['barcode']} in Pool: {tape_info['pool_name']} to {retention_lock_period}.")
-            command = f"vtl tape modify {tape_info['barcode']} pool {tape_info['pool_name']} retention-lock {retention_lock_period}"
-            self.log_message(f"[Executing Command]: {command}")
-            retention_set_result = self.execute_ssh_command(command, self.instance, self.user, self.password)
+        return retention_lock_period
 
-            self.log_message(
-                f"Check Retention Lock Status: Pool Info {tape_info['pool_name']} barcode {tape_info['barcode']} ")
-            command = f"vtl tape show pool {tape_info['pool_name']} barcode {tape_info['barcode']}"
-            self.log_message(f"[Executing Command]: {command}")
+    def set_retention_lock(self, tape_info, updated_info):
+        """
+        Method: set_retention_lock
+        Description: This method checks the state of a tape in the pool snapshot taken after the retention lock was set.
+                     It runs no command itself, lock_tapes runs the modify commands of a whole batch of tapes.
+        Required: tape_info (contains information about the tape including barcode and pool name), updated_info
+                  (TapeInfo of the tape in the pool snapshot, None if the tape is missing from it)
+        Returns: Boolean (True if the tape state is updated to "RO/RL*", False otherwise)
+        """
+        if updated_info:
+            self.log_message("Barcode: %s state: %s", tape_info.barcode, updated_info.state)
+            log_debug(lambda: json.dumps(updated_info.to_dict()))
 
-            data = self.execute_ssh_command(command, self.instance, self.user, self.password)
+        if updated_info and updated_info.state == "RO/RL*":
+            return True
+        else:
+            return False
 
-            updated_info = self.format_tape_data(data)
+    def get_pool_snapshot(self):
+        """
+        Method: get_pool_snapshot
+        Description: This method lists the tapes of the VTL pool once, so the state of every locked tape is verified
+                     from a single "vtl tape show" instead of one show command per tape.
+        Required: vtl_pool_name (assigned to self.pool)
+        Returns: Dictionary of TapeInfo objects by barcode (Also stored in the instance's _pool_snapshot attribute)
+        """
+        vtl_pool_name = self.pool
+        self.log_message(f"Check Retention Lock Status: Pool Info {vtl_pool_name}")
+        command = f"vtl tape show pool {vtl_pool_name}"
+        self.log_message(f"[Executing Command]: {command}")
 
-            self.log_message(json.dumps(updated_info))
+        pool_data = self._run(command)
 
-            if updated_info[0]["state"] == "RO/RL*":
-                return True
-            else:
-                return False
-        else:
-            return False
+        if not pool_data:
+            self.log_message(f"Failed to retrieve Pool: {vtl_pool_name} details.")
+            self._pool_snapshot = {}
+            return {}
+
+        snapshot = {tape.barcode: tape for tape in self.format_tape_data(pool_data)}
+        self._pool_snapshot = snapshot
+        return snapshot
 
     def get_pool_info(self):
         """
@@ -697,110 +612,88 @@ class OpenSystem():
     def apply_retention_lock_to_tapes(self):
         """
         Method: apply_retention_lock_to_tapes
-        Description: This method applies retention lock to all tapes in the tape list if the retention lock governance mode is enabled for the pool. It iterates over each tape, applies the retention lock, and logs the results.
-        Required: tape_list (list of tapes to apply retention lock), pool_retention_lock_enabled (boolean indicating if the pool is in retention lock governance mode)
+        Description: This method applies retention lock to all tapes in the tape list if the retention lock governance mode is enabled for the pool. The tapes are split into up to ssh_workers batches locked concurrently, each over one shell channel of the shared SSH connection. A modify command that could not be run or was rejected by the DD CLI is logged with its tape, then all the tapes are verified against one pool snapshot and the results are logged in tape list order.
+        Required: tape_list (list of tapes to apply retention lock, already filtered by _accept_tape so it holds no tape in RL state), _retention_lock_period (set by validate_input_parameters), ssh_workers (number of concurrent batches), pool_retention_lock_enabled (boolean indicating if the pool is in retention lock governance mode)
         Returns: None
         """
-        if len(self.tape_list) > 0 and self.pool_retention_lock_enabled == True:
+        if not self._retention_lock_period:
+            self.log_message(f"No retention lock period configured for the tapes of pool {self.pool}")
+        elif len(self.tape_list) > 0 and self.pool_retention_lock_enabled == True:
+            # split the tapes into one contiguous batch per worker, each batch runs on its own SSH channel
+            batch_size = -(-len(self.tape_list) // self.ssh_workers)
+            batches = [self.tape_list[i:i + batch_size] for i in range(0, len(self.tape_list), batch_size)]
+            with ThreadPoolExecutor(max_workers=self.ssh_workers) as executor:
+                batch_outputs = list(executor.map(self.lock_tapes, batches))
+
+            # the modify output of every tape, so a rejected or unsent command is logged with its reason
+            for batch, outputs in zip(batches, batch_outputs):
+                for tape, output in zip(batch, outputs):
+                    if output is False:
+                        self.log_message("Retention Lock command for %s could not be run", tape.barcode)
+                    elif DD_CLI_ERROR.search(output):
+                        self.log_message("Retention Lock command for %s failed: %s", tape.barcode, output)
+                    else:
+                        log_debug(lambda: f"Retention Lock command output for {tape.barcode}: {output}")
+
+            # verify all the tapes against one pool listing taken after every modify
+            snapshot = self.get_pool_snapshot()
+
             tape_list_result = []
             for tape in self.tape_list:
-                self.log_message(
-                    f"=======================================================================================")
-                self.log_message(
-                    f"Initiating Retention Lock: Barcode: {tape['barcode']}  used: {tape['used']} state: {tape['state']} ")
-                result = self.set_retention_lock(tape)
-                if result == True:
-                    tape_list_result.append(tape['barcode'])
-                    self.log_message(
-                        f"retention-lock successfully set for {tape['barcode']} in Pool: {tape['pool_name']}")
+                if self.set_retention_lock(tape, snapshot.get(tape.barcode)) == True:
+                    tape_list_result.append(tape.barcode)
+                    self.log_message("retention-lock successfully set for %s in Pool: %s", tape.barcode, tape.pool_name)
                 else:
-                    self.log_message(
-                        f"retention-lock failed to set for {tape['barcode']}")
-                self.log_message(
-                    f"=======================================================================================")
+                    self.log_message("retention-lock failed to set for %s", tape.barcode)
 
             self.log_message(
                 "=======================================RL Result for Barcodes===========================================")
-            self.log_message(json.dumps(self.get_result(tape_list_result), indent=4))
+            result = self.get_result(tape_list_result)
+            self.log_message(f"{len(result)} of {len(self.tape_list)} tapes in retention lock")
+            log_debug(lambda: tapes_to_json(result))
             self.log_message(
                 "========================================================================================================================")
         else:
             self.log_message(f"Failed to enable Retention-Lock Governance Mode for pool {self.pool}")
 
-    def get_result(self, tape_list_result):
+    def lock_tapes(self, tapes):
         """
-        Method: get_result
-        Description: This method fetches the VTL pool tape data after applying retention lock, and returns a list of tape information for the barcodes passed in `tape_list_result`. It retrieves pool data, formats it, and filters the result by barcode.
-        Required: tape_list_result (list of barcodes for which retention lock was applied)
-        Returns: List of dictionaries containing tape information (e.g., barcode, state, size, modification time, etc.)
+        Method: lock_tapes
+        Description: This method sets the retention lock on a batch of tapes. The "vtl tape modify" commands of all the
+                     tapes are run back to back on one shell channel. It is run by the worker threads of
+                     apply_retention_lock_to_tapes, which verifies the tapes afterwards.
+        Required: tapes (list of tapes, each containing the barcode, pool name, used and state), _retention_lock_period
+        Returns: List of str or bool (The output of every modify command, False for the commands that could not be run)
         """
-        vtl_pool_name = self.pool
-        mechanism = self.mechanism
-        self.log_message(f"Fetching Pool: {vtl_pool_name} Tape list result ...")
-        command = f"vtl tape show pool {vtl_pool_name} sort-by modtime descending"
-        pool_data = self.execute_ssh_command(command, self.instance, self.user, self.password)
-        # print(pool_data)
-        if not pool_data:
-            self.log_message(f"Failed to retrieve Pool: {vtl_pool_name} details.")
-            return []
+        retention_lock_period = self._retention_lock_period
 
-        heading = ['Processing tapes....', 'Barcode', 'Pool', 'Location', 'State', 'Size', 'Used (%)', 'Comp',
-                   'Modification Time',
-                   'Total size of tapes:', 'Total pools:', 'Total number of tapes:', 'Average Compression:'
-                                                                                     '--------',
-                   ' --------------------', ' -----------------------', ' -----', ' --------', ' ----------------',
-                   ' ----', ' -------------------'
-                   ]
-        tape_list = []
-        try:
-            for line in pool_data.split("\n"):
-
-                line = line.split('  ')
-
-                if line[0].strip() == '':
-                    continue
-                # print(line)
-                # Check if any element in the array contains a dash '-'
-                # remove_dash = any('-' in item for item in line)
-
-                # if remove_dash:
-                #    continue
+        commands = []
+        for tape in tapes:
+            self.log_message("Initiating Retention Lock: Barcode: %s  used: %s state: %s ", tape.barcode, tape.used,
+                             tape.state)
+            self.log_message("Setting Retention Lock on Barcode: %s in Pool: %s to %s.", tape.barcode,
+                             tape.pool_name, retention_lock_period)
+            modify_command = TAPE_RETENTION_LOCK_COMMAND % (tape.barcode, tape.pool_name, retention_lock_period)
+            self.log_message("[Executing Command]: %s", modify_command)
 
-                # print(line)
-                # Check if any element in the array contains a dash 'Barcode'
-                # remove_heading = True if line[0].strip() in heading else False
-                remove_heading = set(line) & set(heading)
+            commands.append(modify_command)
 
-                if remove_heading:
-                    continue
+        # the modify of every tape of the batch on one shell channel
+        return execute_ssh_batch(commands, self.instance, self.user, self.password)
 
-                if len(line) < 2:
-                    continue
-                # print(line)
-                tapes = []
-
-                for tape_data in line:
-                    tape_data = tape_data.strip()
-                    if tape_data:
-                        tapes.append(tape_data)
-
-                if len(tapes) == 8:
-                    if tapes[0].strip() in tape_list_result:
-                        tape_info = {
-                            "barcode": tapes[0],
-                            "pool_name": tapes[1],
-                            "location": tapes[2],
-                            "state": tapes[3],
-                            "size": tapes[4],
-                            "used": tapes[5],
-                            "modification_time": tapes[7]
-                        }
-                        tape_list.append(tape_info)
-        except Exception as e:
-            self.log_message(str(e))
+    def get_result(self, tape_list_result):
+        """
+        Method: get_result
+        Description: This method returns a list of tape information for the barcodes passed in `tape_list_result` after applying retention lock, taken from the pool snapshot used to verify the tapes.
+        Required: tape_list_result (list of barcodes for which retention lock was applied, all of them verified in the pool snapshot), _pool_snapshot (tape data listed by get_pool_snapshot)
+        Returns: List of TapeInfo objects containing tape information (e.g., barcode, state, size, modification time, etc.)
+        """
+        vtl_pool_name = self.pool
+        tape_list = [self._pool_snapshot[barcode] for barcode in tape_list_result]
 
         log_message("Generating report")
-        generate_report_rl(vtl_pool_name, json.dumps(tape_list, indent=4))
+        generate_report_rl(vtl_pool_name, tapes_to_json(tape_list))
+        flush_reports()
         log_message("report generated successfully")
         return tape_list
 
@@ -808,12 +701,17 @@ class OpenSystem():
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Load and validate YAML input parameters.")
     parser.add_argument("input_parameters", help="Path to the input YAML file.", type=str)
+    parser.add_argument("--debug", help="Log the full tape and report listings.", action="store_true")
+    parser.add_argument("--workers", help=f"Number of tape batches locked concurrently (1-{SSH_MAX_SESSIONS}).",
+                        type=int, choices=range(1, SSH_MAX_SESSIONS + 1), default=SSH_MAX_SESSIONS, metavar="N")
 
     args = parser.parse_args()
     file = args.input_parameters
+    if args.debug:
+        utils.logger.setLevel(logging.DEBUG)
 
     open_system_obj = OpenSystem()
-    open_system_obj.__init__()
+    open_system_obj.ssh_workers = args.workers
 
     # validate loaded yaml file
     open_system_obj.validate_yaml_file(file)
@@ -832,32 +730,36 @@ if __name__ == '__main__':
 
     open_system_obj.decrypt_credentials()
 
-    # check DD VTL Status
-    open_system_obj.check_vtl_state()
+    try:
+        # check DD VTL Status
+        open_system_obj.check_vtl_state()
 
-    # Get Pool Information about RLGE
-    open_system_obj.get_pool_info()
+        # Get Pool Information about RLGE
+        open_system_obj.get_pool_info()
 
-    # generate filesys report of all tapes
-    open_system_obj.generate_filesys_report()
+        # generate filesys report of all tapes
+        open_system_obj.generate_filesys_report()
 
-    # Get and list out all tapes
-    open_system_obj.get_tapes()
+        # Get and list out all tapes
+        open_system_obj.get_tapes()
 
-    if len(open_system_obj.tape_list) > 0:
-        #enable RLGE mode for Pool before applyint RL to tapes
-        open_system_obj.enable_retention_lock_pool()
+        if len(open_system_obj.tape_list) > 0:
+            #enable RLGE mode for Pool before applyint RL to tapes
+            open_system_obj.enable_retention_lock_pool()
 
-        #set minimum RL period for MTREE/POOL
-        open_system_obj.set_min_retention_lock_period_pool()
+            #set minimum RL period for MTREE/POOL
+            open_system_obj.set_min_retention_lock_period_pool()
 
-        #set maximum RL period for MTREE/POOL
-        open_system_obj.set_max_retention_lock_period_pool()
+            #set maximum RL period for MTREE/POOL
+            open_system_obj.set_max_retention_lock_period_pool()
 
-        #apply RL to tapes
-        open_system_obj.apply_retention_lock_to_tapes()
-    else:
-        open_system_obj.log_message("No Tapes are available")
+            #apply RL to tapes
+            open_system_obj.apply_retention_lock_to_tapes()
+        else:
+            open_system_obj.log_message("No Tapes are available")
+    finally:
+        # release the shared SSH connection even when a step fails
+        open_system_obj.close()
 
     open_system_obj.log_message(
         "========================================================================================")
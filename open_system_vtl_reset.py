@@ -1,13 +1,58 @@
 #!usr/bin/python
 import json
+import logging
 import sys
-from datetime import datetime
 import argparse
 import re
+import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 
 import utils
-from utils import run_nsrjb_labeling_command, run_nsrmm_command, run_nsrjb_command, log_message, validate_yaml_file, get_input_parameters, decrypt_credentials, execute_ssh_command, generate_report_expired
+from utils import run_nsrjb_labeling_command, run_nsrmm_command, run_nsrjb_command, log_message, log_debug, validate_yaml_file, get_input_parameters, decrypt_credentials, generate_report_expired, \
+    iter_tape_lines, TapeInfo, RetentionTapeInfo, tapes_to_json, is_retention_locked, is_vtl_available, flush_reports, \
+    execute_ssh_command, iter_ssh_command_lines, close_ssh_transports, SSH_MAX_SESSIONS
+
+# upper bound on tapes recycled at the same time; each worker spends most of its time waiting on networker
+# refreshes and DD CLI round trips, and holds at most one SSH session, so more workers than the SSH session
+# slots would only queue on them
+MAX_TAPE_WORKERS = SSH_MAX_SESSIONS
+
+# upper bounds (seconds) on waiting for networker to catch up after a volume delete and a tape import;
+# the state is polled with an exponential backoff starting at NETWORKER_POLL_INITIAL
+NETWORKER_DELETE_TIMEOUT = 180
+NETWORKER_IMPORT_TIMEOUT = 240
+NETWORKER_POLL_INITIAL = 0.5
+NETWORKER_POLL_FACTOR = 1.5
+NETWORKER_POLL_MAX = 30
+# seconds a single mminfo / nsrjb state query may take, so a hung query cannot stall the wait past its timeout
+NETWORKER_QUERY_TIMEOUT = 30
+# mminfo's answer when no volume matches the query; any other failure says nothing about the volume
+MMINFO_NO_MATCHES = re.compile(r"no matches found", re.I)
+
+# layout of the times in "vtl tape show" output
+TAPE_TIME_FORMAT = "%Y/%m/%d %H:%M:%S"
+
+# trailing slot number of a "<library> slot <n>" tape location
+SLOT_NUMBER = re.compile(r"(\d+)$")
+
+STAGE_EXPORT = "export"
+STAGE_REMOVE = "remove"
+STAGE_CREATE = "create"
+STAGE_IMPORT = "import"
+
+
+@dataclass(slots=True)
+class TapeOutcome:
+    """
+    Class: TapeOutcome
+    Description: The result of the export -> remove -> create -> import pipeline of one tape, as returned by
+                 _process_one_tape; stage_failed_at names the STAGE_* step that failed, None once the tape is recreated.
+    """
+    barcode: str
+    stage_failed_at: str | None
+
 
 class OpenSystemVTLReset():
     # __init__ is a special method called whenever you try to make
@@ -31,6 +76,8 @@ class OpenSystemVTLReset():
         self.log_message = log_message
         self.doamin_specific_pools = []
         self.jukebox_name = []
+        self._now_time = None
+        self._pool_cache = {}
     def set_pool(self, pool):
         self.pool = pool
 
@@ -59,7 +106,8 @@ class OpenSystemVTLReset():
         Required: None
         Returns: None
 
-        - Reads the YAML file and assigns values to class attributes.
+        - Reads the YAML file (or its '<file>.cache.json' cache while the file is unchanged) and assigns values to
+          class attributes.
         - Logs and exits the program if there is an error while loading parameters.
         """
 
@@ -118,6 +166,35 @@ class OpenSystemVTLReset():
            """
         self.user, self.password = decrypt_credentials(self.cred_file)
 
+    def _run(self, command):
+        """
+        Method: _run
+        Description: This method executes a command on the current OpenSystem instance over its pooled SSH connection.
+        Required: command (str) - The command to execute
+        Returns: str or bool (The command output if successful, False otherwise)
+        """
+        return execute_ssh_command(command, self.instance, self.user, self.password)
+
+    def _run_lines(self, command):
+        """
+        Method: _run_lines
+        Description: This method executes a command on the current OpenSystem instance over its pooled SSH connection
+                     and yields its output line by line while it is still being received, instead of returning the
+                     whole output as one string.
+        Required: command (str) - The command to execute
+        Returns: Generator of output lines (raises RuntimeError if the command reports an error)
+        """
+        return iter_ssh_command_lines(command, self.instance, self.user, self.password)
+
+    def close_all(self):
+        """
+        Method: close_all
+        Description: This method closes every SSH connection opened to the OpenSystem instances.
+        Required: None
+        Returns: None
+        """
+        close_ssh_transports()
+
     def check_vtl_state(self):
         """
         Method: check_vtl_state
@@ -127,9 +204,9 @@ class OpenSystemVTLReset():
         Returns: None (Logs the status and updates the instance's VTL_STATUS attribute if VTL is enabled, running, and licensed)
         """
         self.log_message(f"OpenSystem: {self.instance} Checking VTL state...")
-        vtl_status = execute_ssh_command("vtl status", self.instance, self.user, self.password)
+        vtl_status = self._run("vtl status")
 
-        if vtl_status and "enabled" in vtl_status and "running" in vtl_status and "licensed" in vtl_status:
+        if vtl_status and is_vtl_available(vtl_status):
             self.log_message(f"VTL is enabled, running, and licensed.")
             self.VTL_STATUS = True
 
@@ -145,83 +222,35 @@ class OpenSystemVTLReset():
         self.log_message(f"Fetching Pool: {vtl_pool_name} Tape list...")
         command = f"vtl tape show pool {vtl_pool_name} time-display retention sort-by state ascending"
         self.log_message(f"[Executing Command]: {command}")
-        pool_data = execute_ssh_command(command, self.instance, self.user, self.password)
-        if not pool_data:
-            self.log_message(f"Failed to retrieve Pool: {vtl_pool_name} details.")
-            self.retention_locked_tape_list = []
-            return
 
         tape_list = []
-        i = 0
+        # retention times are compared against one reference time for the whole listing, formatted like them
+        # ("%Y/%m/%d %H:%M:%S", zero padded) so that string order is time order and no row needs parsing
+        self._now_time = time.strftime(TAPE_TIME_FORMAT)
         try:
-            for line in pool_data.split("\n"):
-                # parts = line.split()
-                line = line.split('  ')
-
-                i += 1
-                hyphen = line[0].count('-', 0, 2)
-
-                if i > 3 and hyphen > 1:
-                    break
-                if i <= 3:
-                    continue
-
-                tapes = []
-
-                for tape_data in line:
-                    tape_data = tape_data.strip()
-                    if tape_data:
-                        tapes.append(tape_data)
-
-                tape_info = {
-                        "barcode": tapes[0],
-                        "pool_name": tapes[1],
-                        "location": tapes[2],
-                        "state": tapes[3],
-                        "size": tapes[4],
-                        "retention_time": tapes[7]
-                    }
-                state = self.check_state(tape_info)
-                check_retention_date_tape = self.check_retention_date(tape_info)
-                if state and check_retention_date_tape and (tape_info["barcode"] == "TEST34L5" or tape_info["barcode"] == "TEST35L5"):
+            # rows are parsed while the listing is still streaming in, heading and divider rows are skipped
+            for tapes in iter_tape_lines(self._run_lines(command)):
+                tape_info = RetentionTapeInfo.from_columns(tapes)
+                if self.check_state(tape_info) and self.check_retention_date(tape_info):
                     tape_list.append(tape_info)
         except Exception as e:
-            self.log_message(e)
-
-#         if vtl_pool_name == "FEB_3":
-#             tape_list = [    {
-#         "barcode": "A55157LA",
-#         "pool_name": "FEB_3",
-#         "location": "Pool_TEST slot 667",
-#         "state": "RO/RL*",
-#         "size": "5 GiB",
-#         "retention_time": "2025/02/16 19:45:48"
-#     }
-# ]
-#         if vtl_pool_name == "POOL":
-#             tape_list = [  {
-#         "barcode": "A55004LA",
-#         "pool_name": "POOL",
-#         "location": "Pool_TEST slot 714",
-#         "state": "RO/RL*",
-#         "size": "5 GiB",
-#         "retention_time": "2025/02/17 00:00:00"
-#     }
-#
-#
-#             ]
-        self.log_message("Listing Retention Lock expired tapes")
-        self.log_message(json.dumps(tape_list, indent=4))
+            self.log_message(str(e))
+            self.log_message(f"Failed to retrieve Pool: {vtl_pool_name} details.")
+            self.retention_locked_tape_list = []
+            return
+
+        self.log_message(f"{len(tape_list)} Retention Lock expired tapes found in Pool: {vtl_pool_name}")
+        log_debug(lambda: tapes_to_json(tape_list))
 
         self.retention_locked_tape_list = tape_list
 
     def export_tape_from_library(self, tape):
-        location = tape["location"]
-        slot_number = re.search(r'(\d+)$', location)
-        barcode = tape["barcode"]
-        library = location.split(" ")
-        library_name = library[0]
-        vtl_pool_name = tape["pool_name"]
+        location = tape.location
+        slot_number = SLOT_NUMBER.search(location)
+        barcode = tape.barcode
+        # "<library> slot <n>" or "vault"; split(None) also copes with repeated spaces
+        library_name = location.split(None, 1)[0]
+        vtl_pool_name = tape.pool_name
         #if slot number and library is other than vault
         if slot_number and library_name != "vault":
             slot = slot_number.group(1)
@@ -230,7 +259,7 @@ class OpenSystemVTLReset():
             command = f"vtl export {library_name} slot {slot}"
             self.log_message(f"[Executing Command]: {command}")
 
-            execute_result = execute_ssh_command(command, self.instance, self.user, self.password)
+            execute_result = self._run(command)
             if execute_result == False:
                 self.log_message(f"Error while exporitng Barcode: {barcode} from Pool: {vtl_pool_name}")
                 return False
@@ -239,9 +268,9 @@ class OpenSystemVTLReset():
                 return True
     def import_tape_from_library(self, tape):
         vtl_pool_name = self.pool
-        barcode = tape["barcode"]
+        barcode = tape.barcode
 
-        location = tape["location"]
+        location = tape.location
         library = location.split(" ")
         library_name = library[0]
 
@@ -251,7 +280,7 @@ class OpenSystemVTLReset():
             command = f"vtl import {library_name} barcode {barcode} count 1 pool {vtl_pool_name} element slot"
             self.log_message(f"[Executing Command]: {command}")
 
-            execute_result = execute_ssh_command(command, self.instance, self.user, self.password)
+            execute_result = self._run(command)
 
             if execute_result == False:
                 self.log_message(f"Error while importing Barcode: {barcode} to Pool: {vtl_pool_name}")
@@ -271,9 +300,6 @@ class OpenSystemVTLReset():
             """
 
         if len(self.retention_locked_tape_list) > 0:
-            removed_barcodes = []
-            created_tapes = []
-
             failed_tape_while_export = []
             failed_tape_while_remove = []
             failed_tape_while_create = []
@@ -281,117 +307,277 @@ class OpenSystemVTLReset():
             failed_tape_while_delete_on_networker = []
             tapes_not_found_on_jukebox = []
             tapes_not_labled_on_jukebox = []
-            for rl_tape in self.retention_locked_tape_list:
-                self.log_message("===========================================================================================================")
+            failed_buckets = {
+                STAGE_EXPORT: failed_tape_while_export,
+                STAGE_REMOVE: failed_tape_while_remove,
+                STAGE_CREATE: failed_tape_while_create,
+                STAGE_IMPORT: failed_tape_while_import,
+            }
+            recreated_tapes = []
+
+            workers = min(MAX_TAPE_WORKERS, len(self.retention_locked_tape_list))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                available_tapes = []
+                for rl_tape, is_available in zip(self.retention_locked_tape_list,
+                                                 executor.map(self._tape_available_on_jukebox,
+                                                              self.retention_locked_tape_list)):
+                    if is_available:
+                        available_tapes.append(rl_tape)
+                    else:
+                        tapes_not_found_on_jukebox.append(rl_tape)
+
+                # one nsrmm run deletes every available volume from the networker; only the tapes confirmed
+                # absent from the media database go on to be recreated
+                if available_tapes:
+                    deleted_tapes = self._delete_tapes_on_networker(available_tapes)
+                    failed_tape_while_delete_on_networker.extend(
+                        rl_tape for rl_tape in available_tapes if rl_tape not in deleted_tapes)
+                    available_tapes = deleted_tapes
+
+                # every deleted tape runs its own export -> remove -> create -> import pipeline,
+                # so the networker refresh waits and SSH round trips overlap across tapes
+                futures = {executor.submit(self._process_one_tape, rl_tape): rl_tape for rl_tape in available_tapes}
+                for future in as_completed(futures):
+                    rl_tape = futures[future]
+                    try:
+                        outcome = future.result()
+                    except Exception as e:
+                        self.log_message(f"Unexpected error while processing barcode {rl_tape.barcode}: {e}")
+                        continue
+                    if outcome.stage_failed_at is None:
+                        recreated_tapes.append(rl_tape)
+                    else:
+                        failed_buckets[outcome.stage_failed_at].append(rl_tape)
 
-                #verifying tape is available on jukebox networker
-                command = ['/sbin/nsrjb', '-C', '-j', self.jukebox_name,  rl_tape["barcode"]]
-                self.log_message(f"verifying barcode {rl_tape['barcode']} available on jukebox {self.jukebox_name}")
+            # one nsrjb run labels every recreated tape
+            if recreated_tapes and not self._label_tapes_on_networker(recreated_tapes):
+                tapes_not_labled_on_jukebox.extend(recreated_tapes)
 
-                is_available = run_nsrjb_command(command)
+            if len(failed_tape_while_export) > 0:
+                self._log_failed_tapes("[START][FAILED] List of tapes failed while export from library",
+                                       "[END][FAILED] Listing tapes failed while export from library",
+                                       failed_tape_while_export)
 
-                if is_available:
-                    #delete from the networker
-                    command = ['/sbin/nsrmm', '-d', rl_tape["barcode"]]
 
-                    delete_result = run_nsrmm_command(command)
+            if len(failed_tape_while_remove) > 0:
+                self._log_failed_tapes("[START][FAILED] Listing tapes failed while remove from pool",
+                                       "[END][FAILED] Listing tapes failed while remove from pool",
+                                       failed_tape_while_remove)
 
-                    self.log_message(f'Refreshing networker')
 
-                    # sleep 180 seconds to refresh the tape on networker
-                    time.sleep(180)
+            if len(failed_tape_while_create) > 0:
+                self._log_failed_tapes("[START][FAILED] List of tapes failed while create on pool",
+                                       "[END][FAILED] Listing tapes failed while create on pool",
+                                       failed_tape_while_create)
 
-                    # delete from the networker
-                    command = ['/sbin/nsrmm', '-d', rl_tape["barcode"]]
 
-                    check_tape = run_nsrmm_command(command)
+            if len(failed_tape_while_import) > 0:
+                self._log_failed_tapes("[START][FAILED] List of tapes failed while import into pool",
+                                       "[END][FAILED] List of tapes failed while import into pool",
+                                       failed_tape_while_import)
 
-                    log_message(f"checking tape on jukebox {check_tape}")
+            if len(failed_tape_while_delete_on_networker) > 0:
+                self._log_failed_tapes("[START][FAILED] List of tapes failed while deleting at networker",
+                                       "[END][FAILED] List of tapes failed while deleting at networker",
+                                       failed_tape_while_delete_on_networker)
 
-                    if delete_result:
-                        self.log_message(f'barcode {rl_tape["barcode"]} has been deleted from the networker')
-                        export_result = self.export_tape_from_library(rl_tape)
-                        if export_result:
-                            remove_result = self.execute_tape_remove_commmand(rl_tape)
-                            if remove_result:
-                                created_result = self.create_tape(rl_tape)
-                                if created_result:
-                                    import_result = self.import_tape_from_library(rl_tape)
-                                    if import_result:
+            if len(tapes_not_found_on_jukebox) > 0:
+                self._log_failed_tapes(f"[START][FAILED] List of tapes not found on jukebox {self.jukebox_name}",
+                                       f"[END][FAILED] List of tapes not found on jukebox {self.jukebox_name}",
+                                       tapes_not_found_on_jukebox)
 
-                                        self.log_message(f'Refreshing networker')
-                                        #sleep 240 seconds to refresh the tape on networker
-                                        time.sleep(240)
+            if len(tapes_not_labled_on_jukebox) > 0:
+                self._log_failed_tapes(f"[START][FAILED] List of tapes not labeled on jukebox {self.jukebox_name}",
+                                       f"[END][FAILED] List of tapes not labeled on jukebox {self.jukebox_name}",
+                                       tapes_not_labled_on_jukebox)
+            self.created_tapes = [rl_tape.barcode for rl_tape in recreated_tapes]
+        else:
+            self.log_message("No RL tapes found")
+    def _log_failed_tapes(self, start_message, end_message, tapes):
+        """
+        Method: _log_failed_tapes
+        Description: This method logs the barcodes of the tapes that failed at one stage between its START and END
+                     markers; the full tape details are only serialized when DEBUG logging is enabled.
+        Required: start_message, end_message (str), tapes (list of failed tapes)
+        Returns: None
+        """
+        self.log_message(start_message)
+        self.log_message(", ".join(tape.barcode for tape in tapes))
+        log_debug(lambda: tapes_to_json(tapes))
+        self.log_message(end_message)
 
-                                        # labelling the volume
-                                        command = ['/sbin/nsrjb', '-L', '-j', self.jukebox_name, f'-b{self.pool}', '-T', rl_tape["barcode"], '-Y']
+    def _tape_available_on_jukebox(self, rl_tape):
+        """
+        Method: _tape_available_on_jukebox
+        Description: This method verifies that the tape is available on the networker jukebox
+        Required: rl_tape, jukebox_name (assigned to self.jukebox_name)
+        Returns: bool (True if the tape is on the jukebox)
+        """
+        #verifying tape is available on jukebox networker
+        command = ['/sbin/nsrjb', '-C', '-j', self.jukebox_name,  rl_tape.barcode]
+        self.log_message(f"verifying barcode {rl_tape.barcode} available on jukebox {self.jukebox_name}")
 
-                                        self.log_message(f'Labeling barcode {rl_tape["barcode"]} on networker')
+        return run_nsrjb_command(command)
 
-                                        labeling = run_nsrjb_labeling_command(command)
+    def _delete_tapes_on_networker(self, rl_tapes):
+        """
+        Method: _delete_tapes_on_networker
+        Description: This method deletes all the given volumes from the networker with a single nsrmm run and waits
+                     for them to leave the media database; volumes still present afterwards are deleted once more.
+        Required: rl_tapes (list of tapes available on the jukebox)
+        Returns: list (the tapes confirmed absent from the media database)
+
+        - A volume named in the nsrmm error output is checked once straight away instead of being waited for, so
+          one rejected volume neither fails the whole pool nor holds the others up.
+        - A volume is reported deleted only once mminfo no longer finds it.
+        """
+        barcodes = [rl_tape.barcode for rl_tape in rl_tapes]
 
-                                        self.log_message(f'Refreshing networker')
+        #delete from the networker
+        errors = []
+        if not run_nsrmm_command(['/sbin/nsrmm', '-d', '-y', *barcodes], errors):
+            return []
 
-                                        if labeling:
-                                            self.log_message(f'Labeling barcode {rl_tape["barcode"]} on networker is completed')
-                                        else:
-                                            tapes_not_labled_on_jukebox.append(rl_tape)
-                                        created_tapes.append(rl_tape["barcode"])
-                                    else:
-                                        failed_tape_while_import.append(rl_tape)
-                                else:
-                                    failed_tape_while_create.append(rl_tape)
-                            else:
-                                failed_tape_while_remove.append(rl_tape)
-                        else:
-                            failed_tape_while_export.append(rl_tape)
-                    else:
-                        failed_tape_while_delete_on_networker.append(rl_tape)
-                else:
-                    tapes_not_found_on_jukebox.append(rl_tape)
-                self.log_message(
-                    "===========================================================================================================")
+        pending = set(barcodes)
+        failed = set()
+        for barcode in barcodes:
+            rejection = next((line for line in errors if re.search(rf"\b{re.escape(barcode)}\b", line)), None)
+            if rejection is None:
+                continue
+            self.log_message(f'nsrmm rejected barcode {barcode}: {rejection.strip()}')
+            pending.discard(barcode)
+            if not self._tape_absent_on_networker(barcode):
+                failed.add(barcode)
+
+        self.log_message(f'Refreshing networker')
+
+        def all_absent():
+            pending.difference_update([barcode for barcode in pending if self._tape_absent_on_networker(barcode)])
+            return not pending
+
+        # wait (up to 180 seconds) for the volumes to disappear from the media database
+        if pending and not self._wait_until(all_absent, NETWORKER_DELETE_TIMEOUT):
+            # delete the remaining volumes once more and wait for them again
+            self.log_message(f"barcodes still on the networker, deleting again: {', '.join(sorted(pending))}")
+            if not run_nsrmm_command(['/sbin/nsrmm', '-d', '-y', *sorted(pending)]) or \
+                    not self._wait_until(all_absent, NETWORKER_DELETE_TIMEOUT):
+                failed.update(pending)
+
+        deleted_tapes = []
+        for rl_tape in rl_tapes:
+            if rl_tape.barcode in failed:
+                self.log_message(f'barcode {rl_tape.barcode} is still present on the networker')
+            else:
+                self.log_message(f'barcode {rl_tape.barcode} has been deleted from the networker')
+                deleted_tapes.append(rl_tape)
+        return deleted_tapes
 
-            if len(failed_tape_while_export) > 0:
-                self.log_message("[START][FAILED] List of tapes failed while export from library")
-                self.log_message(json.dumps(failed_tape_while_export, indent=4))
-                self.log_message("[END][FAILED] Listing tapes failed while export from library")
+    def _process_one_tape(self, rl_tape):
+        """
+        Method: _process_one_tape
+        Description: Runs the export, remove, create and import steps for a single retention-lock expired tape
+                     that was already deleted from the networker, and waits until the jukebox sees it again
+        Required: rl_tape
+        Returns: TapeOutcome (barcode and the stage the tape failed at, None once it is recreated and imported)
+        """
+        barcode = rl_tape.barcode
 
+        if not self.export_tape_from_library(rl_tape):
+            return TapeOutcome(barcode, STAGE_EXPORT)
+        if not self.execute_tape_remove_commmand(rl_tape):
+            return TapeOutcome(barcode, STAGE_REMOVE)
+        if not self.create_tape(rl_tape):
+            return TapeOutcome(barcode, STAGE_CREATE)
+        if not self.import_tape_from_library(rl_tape):
+            return TapeOutcome(barcode, STAGE_IMPORT)
 
-            if len(failed_tape_while_remove) > 0:
-                self.log_message("[START][FAILED] Listing tapes failed while remove from pool")
-                self.log_message(json.dumps(failed_tape_while_remove, indent=4))
-                self.log_message("[END][FAILED] Listing tapes failed while remove from pool")
+        self.log_message(f'Refreshing networker')
+        # wait (up to 240 seconds) for the imported tape to show up on the jukebox
+        if not self._wait_until(lambda: self._tape_present_on_jukebox(barcode), NETWORKER_IMPORT_TIMEOUT):
+            self.log_message(f"barcode {barcode} not yet visible on jukebox {self.jukebox_name}, labeling anyway")
 
+        return TapeOutcome(barcode, None)
 
-            if len(failed_tape_while_create) > 0:
-                self.log_message("[START][FAILED] List of tapes failed while create on pool")
-                self.log_message(json.dumps(failed_tape_while_create, indent=4))
-                self.log_message("[END][FAILED] Listing tapes failed while create on pool")
+    def _label_tapes_on_networker(self, rl_tapes):
+        """
+        Method: _label_tapes_on_networker
+        Description: This method labels all the recreated tapes into the networker pool with a single nsrjb run,
+                     passing one -T option per barcode.
+        Required: rl_tapes (list of recreated tapes), jukebox_name, pool (assigned to self.jukebox_name, self.pool)
+        Returns: bool (True if the labeling command succeeded)
+        """
+        barcodes = [rl_tape.barcode for rl_tape in rl_tapes]
 
+        # labelling the volumes
+        command = ['/sbin/nsrjb', '-L', '-j', self.jukebox_name, f'-b{self.pool}']
+        for barcode in barcodes:
+            command += ['-T', barcode]
+        command.append('-Y')
 
-            if len(failed_tape_while_import) > 0:
-                self.log_message("[START][FAILED] List of tapes failed while import into pool")
-                self.log_message(json.dumps(failed_tape_while_import, indent=4))
-                self.log_message("[END][FAILED] List of tapes failed while import into pool")
+        self.log_message(f'Labeling barcodes {", ".join(barcodes)} on networker')
 
-            if len(failed_tape_while_delete_on_networker) > 0:
-                self.log_message("[START][FAILED] List of tapes failed while deleting at networker")
-                self.log_message(json.dumps(failed_tape_while_delete_on_networker, indent=4))
-                self.log_message("[END][FAILED] List of tapes failed while deleting at networker")
+        if not run_nsrjb_labeling_command(command):
+            return False
+        self.log_message(f'Labeling barcodes {", ".join(barcodes)} on networker is completed')
+        return True
 
-            if len(tapes_not_found_on_jukebox) > 0:
-                self.log_message(f"[START][FAILED] List of tapes not found on jukebox {self.jukebox_name}")
-                self.log_message(json.dumps(tapes_not_found_on_jukebox, indent=4))
-                self.log_message(f"[END][FAILED] List of tapes not found on jukebox {self.jukebox_name}")
+    def _wait_until(self, predicate, timeout, initial=NETWORKER_POLL_INITIAL, factor=NETWORKER_POLL_FACTOR):
+        """
+        Method: _wait_until
+        Description: This method polls the predicate with an exponential backoff until it returns True or the
+                     timeout expires.
+        Required: predicate (callable) - Returns True once the expected state is reached
+                  timeout (int) - Maximum number of seconds to wait
+        Returns: bool (True if the predicate was satisfied, False on timeout)
+        """
+        deadline = time.monotonic() + timeout
+        delay = initial
+        while True:
+            if predicate():
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(delay, remaining))
+            delay = min(delay * factor, NETWORKER_POLL_MAX)
+
+    def _tape_absent_on_networker(self, barcode):
+        """
+        Method: _tape_absent_on_networker
+        Description: This method checks whether networker no longer has the volume in its media database.
+        Required: barcode (str)
+        Returns: bool (True only if mminfo answers that no volume matches that name; False if the volume is still
+                 listed or mminfo failed, timed out or could not be run)
+        """
+        try:
+            result = subprocess.run(['/sbin/mminfo', '-q', f'volume={barcode}'], capture_output=True, text=True,
+                                    timeout=NETWORKER_QUERY_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            self.log_message(f"mminfo query for volume {barcode} failed: {e}")
+            return False
+        if result.returncode == 0:
+            return False
+        if MMINFO_NO_MATCHES.search(result.stderr) or MMINFO_NO_MATCHES.search(result.stdout):
+            return True
+        self.log_message(f"mminfo query for volume {barcode} failed: {result.stderr.strip()}")
+        return False
+
+    def _tape_present_on_jukebox(self, barcode):
+        """
+        Method: _tape_present_on_jukebox
+        Description: This method checks whether the tape is visible on the networker jukebox.
+        Required: barcode (str), jukebox_name (assigned to self.jukebox_name)
+        Returns: bool (True if nsrjb reports the tape on the jukebox; False otherwise, also if nsrjb timed out or
+                 could not be run)
+        """
+        try:
+            result = subprocess.run(['/sbin/nsrjb', '-C', '-j', self.jukebox_name, barcode], capture_output=True,
+                                    text=True, timeout=NETWORKER_QUERY_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            self.log_message(f"nsrjb query for barcode {barcode} failed: {e}")
+            return False
+        return result.returncode == 0
 
-            if len(tapes_not_labled_on_jukebox) > 0:
-                self.log_message(f"[START][FAILED] List of tapes not labeled on jukebox {self.jukebox_name}")
-                self.log_message(json.dumps(tapes_not_labled_on_jukebox, indent=4))
-                self.log_message(f"[END][FAILED] List of tapes not labeled on jukebox {self.jukebox_name}")
-            self.created_tapes = created_tapes
-        else:
-            self.log_message("No RL tapes found")
     def execute_tape_remove_commmand(self, tape_info):
         """
        Method: execute_tape_remove_commmand
@@ -400,13 +586,13 @@ class OpenSystemVTLReset():
        Returns: None (Logs the filtered list of tapes and stores it in the instance's tape_list attribute)
        """
         vtl_pool_name = self.pool
-        barcode = tape_info['barcode']
+        barcode = tape_info.barcode
 
         self.log_message(f"Removing Tape with Barcode: {barcode} from Pool: {vtl_pool_name} on OpenSystem: {self.instance}.")
         command = f"vtl tape del {barcode} pool {vtl_pool_name}"
         self.log_message(f"[Executing Command]: {command}")
         result = False
-        execute_result = execute_ssh_command(command, self.instance, self.user, self.password)
+        execute_result = self._run(command)
         if execute_result == False:
             self.log_message(f"Error while removing Barcode: {barcode} on Pool: {vtl_pool_name}")
         else:
@@ -421,8 +607,8 @@ class OpenSystemVTLReset():
       Returns: None (Logs the filtered list of tapes and stores it in the instance's tape_list attribute)
       """
         vtl_pool_name = self.pool
-        barcode = rl_tape['barcode']
-        size_str = rl_tape['size'].strip()
+        barcode = rl_tape.barcode
+        size_str = rl_tape.size.strip()
         size_value, size_unit = size_str.split()
         size_value = int(size_value)
 
@@ -431,7 +617,7 @@ class OpenSystemVTLReset():
         command = f"vtl tape add {barcode} capacity {size_value} pool {vtl_pool_name}"
         self.log_message(f"[Executing Command]: {command}")
         result = False
-        execute_result = execute_ssh_command(command, self.instance, self.user, self.password)
+        execute_result = self._run(command)
         if execute_result == False:
             self.log_message(f"Error while creating Barcode: {barcode} on Pool: {vtl_pool_name}")
         else:
@@ -445,37 +631,21 @@ class OpenSystemVTLReset():
         Required: tape_info (contains information about the tape including its state)
         Returns: Boolean (True if the tape is in Retention Lock mode, False otherwise)
         """
-        # self.log_message(f"checking STATE for Bardcode: {tape_info['barcode']} state:{tape_info['state']}")
-        state = tape_info["state"]
-        state = state.strip()
-        if "RL" in state:
-            # self.log_message(f"Bardcode: {tape_info['barcode']} state:{tape_info['state']} Retention-Lock already set")
-            return True
-        else:
-            return False
+        # self.log_message(f"checking STATE for Bardcode: {tape_info.barcode} state:{tape_info.state}")
+        return is_retention_locked(tape_info.state)
 
     def check_retention_date(self, tape_info):
         """
-        Method: check_modification_date
-        Description: This method checks the modification date of the tape against the current date and yesterday's date. It validates the modification date based on the specified mechanism:
-                     - Mechanism 1: The tape should have been modified today.
-                     - Mechanism 2: The tape should have been modified yesterday.
-        Required: tape_info (contains modification date of the tape), mechanism (integer value to determine the date comparison)
-        Returns: Boolean (True if the modification date matches the expected date based on the mechanism, False otherwise)
+        Method: check_retention_date
+        Description: This method checks whether the retention lock of the tape has expired, i.e. its retention time
+                     lies before the reference time taken when the pool listing was fetched. Both are fixed-width
+                     "%Y/%m/%d %H:%M:%S" strings, so they are compared as strings.
+        Required: tape_info (contains retention time of the tape), _now_time (set by get_tapes_by_pool)
+        Returns: Boolean (True if the retention time has passed, False otherwise or if the tape has no retention time)
         """
 
-        if tape_info["retention_time"] != "n/a":
-            modified_date = datetime.strptime(tape_info["retention_time"], '%Y/%m/%d %H:%M:%S')
-
-            modified_date_timestamp = int(modified_date.timestamp())
-
-            # todays date
-            current_time_stamp = datetime.now().timestamp()
-
-            if current_time_stamp > modified_date_timestamp:
-                return True
-            else:
-                return False
+        if tape_info.retention_time != "n/a":
+            return tape_info.retention_time < self._now_time
         else:
             return False
 
@@ -489,111 +659,70 @@ class OpenSystemVTLReset():
         Method: get_result
         Description: This method fetches the VTL pool tape data after applying retention lock, and returns a list of tape information for the barcodes passed in `tape_list_result`. It retrieves pool data, formats it, and filters the result by barcode.
         Required: tape_list_result (list of barcodes for which retention lock was applied)
-        Returns: List of dictionaries containing tape information (e.g., barcode, state, size, modification time, etc.)
+        Returns: List of TapeInfo objects containing tape information (e.g., barcode, state, size, modification time, etc.)
         """
         vtl_pool_name = self.pool
         self.log_message(f"Fetching Pool: {vtl_pool_name} Tape list result ...")
         command = f"vtl tape show pool {vtl_pool_name} sort-by modtime descending"
-        pool_data = execute_ssh_command(command, self.instance, self.user, self.password)
-        # print(pool_data)
-        if not pool_data:
-            self.log_message(f"Failed to retrieve Pool: {vtl_pool_name} details.")
-            return []
 
-        heading = ['Processing tapes....', 'Barcode', 'Pool', 'Location', 'State', 'Size', 'Used (%)', 'Comp',
-                   'Modification Time',
-                   'Total size of tapes:', 'Total pools:', 'Total number of tapes:', 'Average Compression:'
-                                                                                     '--------',
-                   ' --------------------', ' -----------------------', ' -----', ' --------', ' ----------------',
-                   ' ----', ' -------------------'
-                   ]
-        tape_list = []
+        wanted_barcodes = set(tape_list_result)
         try:
-            for line in pool_data.split("\n"):
-                line = line.split('  ')
-
-                if line[0].strip() == '':
-                    continue
-
-                # Check if any element in the array contains a dash '-'
-                remove_dash = any('-' in item for item in line)
-
-                if remove_dash:
-                    continue
-
-                # Check if any element in the array contains a dash 'Barcode'
-                # remove_heading = True if line[0].strip() in heading else False
-                remove_heading = set(line) & set(heading)
-
-                if remove_heading:
-                    continue
-
-                if len(line) < 2:
-                    continue
-
-                tapes = []
-
-                for tape_data in line:
-                    tape_data = tape_data.strip()
-                    if tape_data:
-                        tapes.append(tape_data)
-
-                if len(tapes) > 0:
-                    if tapes[0].strip() in tape_list_result:
-                        tape_info = {
-                            "barcode": tapes[0],
-                            "pool_name": tapes[1],
-                            "location": tapes[2],
-                            "state": tapes[3],
-                            "size": tapes[4],
-                            "used": tapes[5],
-                            "modification_time": tapes[7]
-                        }
-                        tape_list.append(tape_info)
+            # rows are parsed while the listing is still streaming in, only tape rows match
+            tape_list = [TapeInfo.from_columns(tapes) for tapes in iter_tape_lines(self._run_lines(command))
+                         if tapes[0] in wanted_barcodes]
         except Exception as e:
             self.log_message(str(e))
+            self.log_message(f"Failed to retrieve Pool: {vtl_pool_name} details.")
+            return []
+        if len(tape_list) < len(wanted_barcodes):
+            self.log_message(f"{len(wanted_barcodes) - len(tape_list)} tapes not found in Pool: {vtl_pool_name}")
 
         log_message("Generating report")
-        generate_report_expired(self.pool, json.dumps(tape_list, indent=4))
+        generate_report_expired(self.pool, tapes_to_json(tape_list))
+        flush_reports()
         log_message("report generated successfully")
-        self.log_message(json.dumps(tape_list, indent=4))
+        log_debug(lambda: tapes_to_json(tape_list))
     def get_pools_present_on_VTL(self):
-        open_system_pool_names = self.pools
-        result = [x.strip() for x in open_system_pool_names.split(',')]
+        # the pool list of an instance does not change during a run, only ask each OpenSystem once
+        if self.instance in self._pool_cache:
+            self.doamin_specific_pools = self._pool_cache[self.instance]
+            return
+
+        wanted_pools = {x.strip() for x in self.pools.split(',')}
 
         self.log_message(f"check all Pools exist on OpenSystem: {self.instance} provided on list:")
         command = f"vtl pool show all"
         self.log_message(f"[Executing Command]: {command}")
 
-        pool_data = execute_ssh_command(command, self.instance, self.user, self.password)
+        pool_data = self._run(command)
 
         if not pool_data:
             self.log_message(f"No data found")
+            # not cached, the next call for this instance asks again
+            self.doamin_specific_pools = []
             return []
 
+        # the pool name is the first column; headings and dividers never match a requested pool
         exist_pool_list = []
-        i = 0
-        try:
-            for line in pool_data.split("\n"):
-                # parts = line.split()
-                line = line.split('  ')
-                if type(line) == list and line[0] in result:
-                    exist_pool_list.append(line[0].strip())
-
-        except Exception as e:
-            self.log_message(e)
+        for line in pool_data.splitlines():
+            columns = line.split(None, 1)
+            if columns and columns[0] in wanted_pools and columns[0] not in exist_pool_list:
+                exist_pool_list.append(columns[0])
 
         self.doamin_specific_pools = exist_pool_list
+        self._pool_cache[self.instance] = exist_pool_list
         self.log_message(f"These pools are processing from OpenSystem: {self.instance} Pools:  {json.dumps(exist_pool_list)}")
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Load and validate YAML input parameters.")
     parser.add_argument("input_parameters", help="Path to the input YAML file.", type=str)
+    parser.add_argument("--debug", help="Log the full tape and report listings.", action="store_true")
 
     args = parser.parse_args()
     file = args.input_parameters
+    if args.debug:
+        utils.logger.setLevel(logging.DEBUG)
 
     open_system_reset_obj = OpenSystemVTLReset()
-    open_system_reset_obj.__init__()
 
     # validate loaded yaml file
     open_system_reset_obj.validate_yaml_file(file)
@@ -615,31 +744,34 @@ if __name__ == '__main__':
     open_system_instances = open_system_reset_obj.instances
     # open_system_pool_names = open_system_reset_obj.pools
 
-    for open_system_instance in open_system_instances.split(","):
-        #setting the each instance to the object
-        open_system_reset_obj.set_instance(open_system_instance.strip())
+    try:
+        for open_system_instance in open_system_instances.split(","):
+            #setting the each instance to the object
+            open_system_reset_obj.set_instance(open_system_instance.strip())
 
-        open_system_reset_obj.get_pools_present_on_VTL()
+            open_system_reset_obj.get_pools_present_on_VTL()
 
-        open_system_pool_names = open_system_reset_obj.doamin_specific_pools
+            open_system_pool_names = open_system_reset_obj.doamin_specific_pools
 
-        # checking the VTL status of each instance
-        open_system_reset_obj.check_vtl_state()
-        if len(open_system_pool_names):
-            for pool_name in open_system_pool_names:
-                # setting the each instance to the object
-                open_system_reset_obj.set_pool(pool_name.strip())
+            # checking the VTL status of each instance
+            open_system_reset_obj.check_vtl_state()
+            if len(open_system_pool_names):
+                for pool_name in open_system_pool_names:
+                    # setting the each instance to the object
+                    open_system_reset_obj.set_pool(pool_name.strip())
 
-                #get all retention-lock expired tapes
-                open_system_reset_obj.get_tapes_by_pool()
+                    #get all retention-lock expired tapes
+                    open_system_reset_obj.get_tapes_by_pool()
 
-                # auto delete and create RL expired tapes
-                open_system_reset_obj.remove_retention_locked_tapes()
+                    # auto delete and create RL expired tapes
+                    open_system_reset_obj.remove_retention_locked_tapes()
 
-                # check the result
-                open_system_reset_obj.check_result()
-        else:
-            open_system_reset_obj.log_message(f"No pools exist on OpenSystem: {open_system_instance}")
+                    # check the result
+                    open_system_reset_obj.check_result()
+            else:
+                open_system_reset_obj.log_message(f"No pools exist on OpenSystem: {open_system_instance}")
+    finally:
+        open_system_reset_obj.close_all()
     open_system_reset_obj.log_message(
         "========================================================================================")
     open_system_reset_obj.log_message(
@@ -1,107 +1,319 @@
 import time
 import sys
 import os
+import re
 import base64
-import yaml
+import binascii
+import functools
+import json
+import copy
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timedelta
-import paramiko
-import urllib3
 import subprocess
-
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
+import select
+import threading
+import logging
+import logging.handlers
+import queue
+import atexit
+from dataclasses import dataclass, asdict
 
 full_path = os.path.abspath(os.path.dirname(__file__))
 DATE = datetime.now().strftime("%d_%m_%Y")
-LOGFILE = f"./script_{DATE}.log"
-LOGSFOLDER = full_path+"/logs/"
+LOGFILE = f"script_{DATE}.log"
+LOGSFOLDER = os.path.join(full_path, "logs")
+LOG_PATH = os.path.join(LOGSFOLDER, LOGFILE)
 
 REPORT_DATE_TIME = datetime.now().strftime("%d_%m_%Y_%H_%M_%S")
 
 #Retention Lock report
-RETENTION_LOCK_REPORT_FOLDER = full_path+'/reports_retention_lock/'
+RETENTION_LOCK_REPORT_FOLDER = os.path.join(full_path, 'reports_retention_lock')
 
 #Expired Retention Lock report
-EXPIRED_RL_REPORT_FOLDER = full_path+'/reports_expired_RL/'
+EXPIRED_RL_REPORT_FOLDER = os.path.join(full_path, 'reports_expired_RL')
+
+# parsed input parameters already loaded by this process, path -> ((mtime_ns, size), data), least recently used first
+INPUT_PARAMETERS_CACHE = OrderedDict()
+INPUT_PARAMETERS_CACHE_SIZE = 100
+
+# first-column values of the heading and summary lines of "vtl tape show" output
+TAPE_HEADINGS = frozenset({'Processing tapes....', 'Barcode', 'Pool', 'Location', 'State', 'Size', 'Used (%)', 'Comp',
+                           'Modification Time', 'Total size of tapes:', 'Total pools:', 'Total number of tapes:',
+                           'Average Compression:'})
+
+# flags the "vtl status" output must show before any tape is touched
+VTL_REQUIRED_FLAGS = ('enabled', 'running', 'licensed')
+VTL_STATUS_FLAGS = re.compile(r"\b(?:" + "|".join(VTL_REQUIRED_FLAGS) + r")\b")
+
+# "/" separated tape state flags that mark a Retention Lock ("RO/RL*" once the lock is applied)
+RETENTION_LOCK_FLAGS = frozenset({'RL', 'RL*'})
 
-heading = ['Processing tapes....', 'Barcode', 'Pool', 'Location', 'State', 'Size', 'Used (%)', 'Comp',
-               'Modification Time',
-               'Total size of tapes:', 'Total pools:', 'Total number of tapes:', 'Average Compression:'
-                                                                                 '--------',
-               ' --------------------', ' -----------------------', ' -----', ' --------', ' ----------------',
-               ' ----', ' -------------------'
-               ]
+# console + log file logger shared by the scripts, written by a background thread; the handlers are attached on
+# first use, so LOGSFOLDER is only created once something is logged. Full per-tape dumps are logged at DEBUG level (--debug)
+logger = logging.getLogger("openvtl")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+LOG_DATE_FORMAT = "%d-%m-%Y %I:%M:%S %p"
+LOG_SETUP_LOCK = threading.Lock()
+LOG_LISTENER = None
+# seconds the log file may lag behind the console; the file is flushed at most this often instead of per record
+LOG_FLUSH_INTERVAL = 1.0
 
+# log and report folders already created (or found) by this run
+CREATED_FOLDERS = set()
+# input parameter files already found by validate_yaml_file in this run
+FOUND_FILES = set()
 
-def log_message(message):
+# DD CLI tables separate their columns with two or more spaces, single spaces belong to the value
+COLUMN_SEPARATOR = re.compile(r"\s{2,}")
+
+# one row of the 8-column "vtl tape show" table; the whole output is scanned in a single finditer pass and lines
+# with another column count (blank, summary) do not match. Separators are [ \t] so a match never spans lines
+TAPE_ROW_RE = re.compile(r"^[ \t]*" + r"[ \t]{2,}".join([r"(\S+(?: \S+)*)"] * 8) + r"[ \t]*\r?$", re.M)
+
+
+def ensure_folder(folder):
     """
-    Logs a message with the current timestamp.
+    Creates a folder if it does not exist yet, checking each folder only once per run.
 
-    Method: log_message
-    Required: message (str) - The message to log
+    Method: ensure_folder
+    Required: folder (str) - The path of the folder
     Returns: None
+    """
+    if folder not in CREATED_FOLDERS:
+        os.makedirs(folder, exist_ok=True)
+        CREATED_FOLDERS.add(folder)
+
+class BufferedFileHandler(logging.FileHandler):
+    """
+    Class: BufferedFileHandler
+    Description: A log file handler that leaves the records in the file buffer and flushes it at most every
+                 LOG_FLUSH_INTERVAL seconds, so a chatty run costs a write() per buffer instead of one per line.
+                 A daemon thread flushes records still buffered after a quiet interval, so tail -f keeps up.
+    """
+
+    def __init__(self, filename):
+        super().__init__(filename)
+        self._last_flush = time.monotonic()
+        self._closed = threading.Event()
+        threading.Thread(target=self._flush_periodically, name="log-flush", daemon=True).start()
+
+    def _flush_now(self):
+        with self.lock:
+            if self.stream:
+                self.stream.flush()
+            self._last_flush = time.monotonic()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(LOG_FLUSH_INTERVAL):
+            self._flush_now()
+
+    def flush(self):
+        if time.monotonic() - self._last_flush >= LOG_FLUSH_INTERVAL:
+            self._flush_now()
+
+    def close(self):
+        self._closed.set()
+        self._flush_now()
+        super().close()
+
+class CachedTimeFormatter(logging.Formatter):
+    """
+    Class: CachedTimeFormatter
+    Description: A log formatter that formats the timestamp once per second; the records logged within the same
+                 second, and the console and file copies of a record, reuse the cached string instead of calling
+                 strftime for every line.
+    """
+
+    def __init__(self, fmt, datefmt):
+        super().__init__(fmt, datefmt)
+        self._cached_time = (None, "")
+
+    def formatTime(self, record, datefmt=None):
+        second = int(record.created)
+        cached_second, formatted = self._cached_time
+        if second != cached_second:
+            formatted = time.strftime(datefmt or self.datefmt, self.converter(second))
+            self._cached_time = (second, formatted)
+        return formatted
+
+LOG_FORMATTER = CachedTimeFormatter("%(asctime)s  %(message)s", datefmt=LOG_DATE_FORMAT)
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Class: DeferredQueueHandler
+    Description: A queue handler that enqueues the record as it is; the stock QueueHandler formats every record in
+                 the calling thread, here the message and timestamp are formatted by the listener thread when the
+                 record is written. The arguments of a record must therefore not be changed after logging it.
+    """
+
+    def prepare(self, record):
+        return record
+
+def get_logger():
+    """
+    Returns the script logger, attaching its handlers on first use.
+
+    Method: get_logger
+    Required: None
+    Returns: logging.Logger
 
-    - Prints the log message to the console with a timestamp.
     - Checks if the log folder exists, creates it if it does not.
-    - Writes the log message into a log file.
+    - Sends the records through a queue to a background listener thread, which writes them to the console and
+      a single buffered log file handler, so callers never wait for the log I/O or the record formatting.
+    - The listener is stopped at exit by stop_logger, after writing the remaining records.
+    """
+    global LOG_LISTENER
+    if not logger.handlers:
+        with LOG_SETUP_LOCK:
+            if not logger.handlers:
+                ensure_folder(LOGSFOLDER)
+
+                handlers = (logging.StreamHandler(sys.stdout), BufferedFileHandler(LOG_PATH))
+                for handler in handlers:
+                    handler.setFormatter(LOG_FORMATTER)
+
+                log_queue = queue.SimpleQueue()
+                LOG_LISTENER = logging.handlers.QueueListener(log_queue, *handlers)
+                LOG_LISTENER.start()
+                logger.addHandler(DeferredQueueHandler(log_queue))
+    return logger
+
+@atexit.register
+def stop_logger():
     """
-    current_time = datetime.now().strftime("%d-%m-%Y %I:%M:%S %p")
-    log_entry = f"{current_time}  {message}"
-    print(log_entry)
+    Stops the log listener thread after it has written the remaining records; runs at interpreter exit.
 
-    # Check if the folder exists, if not, create it
-    if not os.path.exists(LOGSFOLDER):
-        os.makedirs(LOGSFOLDER)
+    Method: stop_logger
+    Required: None
+    Returns: None
 
-    with open(LOGSFOLDER + LOGFILE, "a") as log_file:
-        log_file.write(log_entry + "\n")
+    - Registered at import, before close_reports and close_ssh_transports, so that it runs after them (atexit runs
+      in reverse order) and the messages they log at exit still reach the console and the log file.
+    """
+    if LOG_LISTENER is not None:
+        LOG_LISTENER.stop()
 
-def generate_report_expired(pool, tapes):
+def log_message(message, *args):
     """
     Logs a message with the current timestamp.
 
     Method: log_message
-    Required: message (str) - The message to log
+    Required: message (str) - The message to log, args - Optional values for the %s placeholders of the message
     Returns: None
 
     - Prints the log message to the console with a timestamp.
-    - Checks if the log folder exists, creates it if it does not.
-    - Writes the log message into a log file.
+    - Writes the log message into the log file.
+    - The message is only %-formatted with args when it is emitted.
     """
+    get_logger().info(message, *args)
 
-    # Check if the folder exists, if not, create it
-    if not os.path.exists(EXPIRED_RL_REPORT_FOLDER):
-        os.makedirs(EXPIRED_RL_REPORT_FOLDER)
+def log_debug(message):
+    """
+    Logs a debug message, only when DEBUG level is enabled.
 
-    REPORT_FILE = f"{pool}_report_{REPORT_DATE_TIME}.txt"
+    Method: log_debug
+    Required: message (str or callable) - The message to log, or a callable building it
+    Returns: None
 
-    with open(EXPIRED_RL_REPORT_FOLDER + REPORT_FILE, "a") as log_file:
-        log_message(f"Report generated on {EXPIRED_RL_REPORT_FOLDER + REPORT_FILE}")
-        log_file.write(tapes + "\n")
+    - A callable is only invoked when DEBUG level is enabled, so large dumps cost nothing otherwise.
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        get_logger().debug(message() if callable(message) else message)
 
+# report files kept open for the rest of the run, (folder, pool) -> file object; closed (and flushed) at exit
+REPORT_FILES = {}
+REPORT_FILES_LOCK = threading.Lock()
+REPORT_BUFFER_SIZE = 65536
+# report content not written yet, (folder, pool) -> list of str; written with one write() per report by flush_reports
+REPORT_BUFFERS = defaultdict(list)
 
-def generate_report_rl(pool, tapes):
+def report_path(folder, pool):
     """
-    Logs a message with the current timestamp.
+    Method: report_path
+    Description: This method returns the path of the '<pool>_report_<date time>.txt' report of a pool.
+    Required: folder (str) - The report folder, pool (str) - The pool name
+    Returns: str
+    """
+    return os.path.join(folder, f"{pool}_report_{REPORT_DATE_TIME}.txt")
 
-    Method: log_message
-    Required: message (str) - The message to log
+def write_report(folder, pool, tapes):
+    """
+    Appends tape information to the report of a pool.
+
+    Method: write_report
+    Required: folder (str) - The report folder, pool (str) - The pool name, tapes (str) - The report content
     Returns: None
 
-    - Prints the log message to the console with a timestamp.
-    - Checks if the log folder exists, creates it if it does not.
-    - Writes the log message into a log file.
+    - Only queues the content in REPORT_BUFFERS; flush_reports writes all queued content of a report at once.
+    """
+    with REPORT_FILES_LOCK:
+        REPORT_BUFFERS[(folder, pool)].append(tapes)
+
+def flush_reports():
+    """
+    Writes the queued content of every report to its file.
+
+    Method: flush_reports
+    Required: None
+    Returns: None
+
+    - Opens the report of a pool on its first flush and keeps it open; the queued entries of a report are joined and
+      written with a single write(), then flushed to the file.
+    - Called by the scripts once a report is complete; close_reports calls it again at exit as a backstop.
+    """
+    with REPORT_FILES_LOCK:
+        for (folder, pool), entries in REPORT_BUFFERS.items():
+            report_file = REPORT_FILES.get((folder, pool))
+            if report_file is None:
+                ensure_folder(folder)
+                path = report_path(folder, pool)
+                report_file = open(path, "a", buffering=REPORT_BUFFER_SIZE)
+                REPORT_FILES[(folder, pool)] = report_file
+                log_message(f"Report generated on {path}")
+            report_file.write("\n".join(entries) + "\n")
+            report_file.flush()
+        REPORT_BUFFERS.clear()
+
+@atexit.register
+def close_reports():
     """
+    Flushes and closes every report file; also runs at interpreter exit.
+
+    Method: close_reports
+    Required: None
+    Returns: None
+    """
+    flush_reports()
+    with REPORT_FILES_LOCK:
+        for report_file in REPORT_FILES.values():
+            report_file.close()
+        REPORT_FILES.clear()
+
+def generate_report_expired(pool, tapes):
+    """
+    Writes tape information into the report of recreated Retention Lock expired tapes.
+
+    Method: generate_report_expired
+    Required: pool (str) - The pool name, tapes (str) - The report content
+    Returns: None
+
+    - Appends to the pool's report in EXPIRED_RL_REPORT_FOLDER, creating the folder on first use.
+    """
+    write_report(EXPIRED_RL_REPORT_FOLDER, pool, tapes)
+
 
-    # Check if the folder exists, if not, create it
-    if not os.path.exists(RETENTION_LOCK_REPORT_FOLDER):
-        os.makedirs(RETENTION_LOCK_REPORT_FOLDER)
+def generate_report_rl(pool, tapes):
+    """
+    Writes tape information into the report of Retention Locked tapes.
 
-    REPORT_FILE = f"{pool}_report_{REPORT_DATE_TIME}.txt"
+    Method: generate_report_rl
+    Required: pool (str) - The pool name, tapes (str) - The report content
+    Returns: None
 
-    with open(RETENTION_LOCK_REPORT_FOLDER + REPORT_FILE, "a") as log_file:
-        log_message(f"Report generated on {RETENTION_LOCK_REPORT_FOLDER + REPORT_FILE}")
-        log_file.write(tapes + "\n")
+    - Appends to the pool's report in RETENTION_LOCK_REPORT_FOLDER, creating the folder on first use.
+    """
+    write_report(RETENTION_LOCK_REPORT_FOLDER, pool, tapes)
 
 def validate_yaml_file(file):
     """
@@ -114,15 +326,77 @@ def validate_yaml_file(file):
     - Checks if the file exists in the provided path.
     - If the file exists, sets the input parameters file to the full path.
     - If the file does not exist, logs an error message.
+    - A file found once is not checked again; a missing file is checked on every call, so it is found once created.
     """
-    filepath = full_path + "/" + file
+    filepath = os.path.join(full_path, file)
     input_parameters_file = None
-    if os.path.exists(filepath):
+    if filepath in FOUND_FILES or os.path.exists(filepath):
+        FOUND_FILES.add(filepath)
         input_parameters_file = filepath
     else:
         log_message(f"The file '{file}' does not exist.")
     return input_parameters_file
 
+def load_cached_input_parameters(cache_file_path, file_stat):
+    """
+    Loads previously parsed input parameters from the JSON cache file.
+
+    Method: load_cached_input_parameters
+    Required: cache_file_path (str) - The full path to the JSON cache file
+              file_stat (os.stat_result) - The stat of the YAML file the cache was built from
+    Returns: dict or None
+
+    - Returns the cached data only if it was built from the YAML file with the same mtime and size.
+    - Returns None if the cache is missing, stale or unreadable.
+    """
+    try:
+        with open(cache_file_path, 'r') as cache_file:
+            cache = json.load(cache_file)
+        if cache.get("mtime_ns") == file_stat.st_mtime_ns and cache.get("size") == file_stat.st_size:
+            return cache.get("data")
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None
+
+def save_cached_input_parameters(cache_file_path, file_stat, data):
+    """
+    Saves parsed input parameters into the JSON cache file.
+
+    Method: save_cached_input_parameters
+    Required: cache_file_path (str) - The full path to the JSON cache file
+              file_stat (os.stat_result) - The stat of the YAML file the data was parsed from
+              data (dict) - The parsed input parameters
+    Returns: None
+
+    - Writes into a temporary file and renames it, so a concurrent run never reads a partial cache.
+    - A cache that cannot be written is not an error, the YAML file is simply parsed again next run.
+    """
+    temp_file_path = f"{cache_file_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_file_path, 'w') as cache_file:
+            json.dump({"mtime_ns": file_stat.st_mtime_ns, "size": file_stat.st_size, "data": data}, cache_file)
+        os.replace(temp_file_path, cache_file_path)
+    except (OSError, TypeError, ValueError):
+        if os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+
+def remember_input_parameters(input_file_path, file_key, data):
+    """
+    Keeps parsed input parameters in the in-process cache.
+
+    Method: remember_input_parameters
+    Required: input_file_path (str) - The full path to the YAML file
+              file_key (tuple) - The (mtime_ns, size) of the YAML file the data was parsed from
+              data (dict) - The parsed input parameters
+    Returns: None
+
+    - Evicts the least recently used files once more than INPUT_PARAMETERS_CACHE_SIZE are cached.
+    """
+    INPUT_PARAMETERS_CACHE[input_file_path] = (file_key, data)
+    INPUT_PARAMETERS_CACHE.move_to_end(input_file_path)
+    while len(INPUT_PARAMETERS_CACHE) > INPUT_PARAMETERS_CACHE_SIZE:
+        INPUT_PARAMETERS_CACHE.popitem(last=False)
+
 def get_input_parameters(input_file_path):
     """
     Loads and reads the YAML file at the specified path.
@@ -131,17 +405,52 @@ def get_input_parameters(input_file_path):
     Required: input_file_path (str) - The full path to the YAML file
     Returns: dict or None
 
-    - Reads the YAML file and returns the data as a dictionary.
-    - If an error occurs, logs the exception and exits the program.
+    - Returns a copy of the data already loaded by this process if the YAML file has not changed since.
+    - Returns the data from the '<file>.cache.json' cache if the YAML file has not changed since it was written.
+    - Otherwise reads the YAML file, refreshes the cache and returns the data as a dictionary.
+    - If the file does not hold a mapping of parameters, or an error occurs, logs the exception and exits the program.
     """
     try:
+        file_stat = os.stat(input_file_path)
+        file_key = (file_stat.st_mtime_ns, file_stat.st_size)
+
+        # copies, so a caller changing its parameters does not change them for the next one
+        cached = INPUT_PARAMETERS_CACHE.get(input_file_path)
+        if cached is not None and cached[0] == file_key:
+            INPUT_PARAMETERS_CACHE.move_to_end(input_file_path)
+            return copy.deepcopy(cached[1])
+
+        cache_file_path = input_file_path + ".cache.json"
+
+        data = load_cached_input_parameters(cache_file_path, file_stat)
+        if data is not None:
+            remember_input_parameters(input_file_path, file_key, data)
+            return copy.deepcopy(data)
+
+        # imported only on a cache miss; libyaml-backed loader when PyYAML was built with it
+        import yaml
+        loader = getattr(yaml, "CSafeLoader", None)
+        if loader is None:
+            log_message("PyYAML is installed without libyaml bindings, parsing the input file with the slower "
+                        "pure Python loader.")
+            loader = yaml.SafeLoader
+
         with open(input_file_path, 'r') as index_file:
-            data = yaml.safe_load(index_file)
-            return data
+            data = yaml.load(index_file, Loader=loader)
+
+        # the parameters are flat "key: value" pairs, reject anything else before it reaches the scripts
+        if not isinstance(data, dict):
+            log_message(f"The file '{input_file_path}' must contain 'parameter: value' pairs.")
+            sys.exit(1)
+
+        save_cached_input_parameters(cache_file_path, file_stat, data)
+        remember_input_parameters(input_file_path, file_key, data)
+        return copy.deepcopy(data)
     except Exception as e:
         log_message(str(e))
         sys.exit(1)
 
+@functools.lru_cache(maxsize=8)
 def decrypt_credentials(cred_file):
     """
     Decrypts credentials (username and password) from a base64-encoded file.
@@ -150,18 +459,178 @@ def decrypt_credentials(cred_file):
     Required: None
     Returns: tuple or None
 
-    - Reads the credentials file and decodes the username and password.
+    - Reads the credentials file with a single read and decodes the username and password from its first two lines.
+    - Rejects lines that are not valid base64 instead of silently dropping the invalid characters.
     - Returns a tuple (username, password).
+    - The result is cached per credentials file, so the file is read and decoded only once per run.
     """
     if cred_file:
-        filepath = full_path + "/" + cred_file
-        with open(filepath) as cred_file:
-            lines = [line.strip() for line in cred_file.readlines()]
-            user = base64.b64decode(lines[0]).decode('UTF-8')
-            password = base64.b64decode(lines[1]).decode('UTF-8')
-            return user, password
+        filepath = os.path.join(full_path, cred_file)
+        with open(filepath, "rb") as cred_file:
+            lines = cred_file.read().splitlines()
+        if len(lines) < 2:
+            log_message(f"Invalid credentials file '{filepath}': expected the username and password on two lines")
+            sys.exit(1)
+        try:
+            user = base64.b64decode(lines[0].strip(), validate=True).decode('UTF-8')
+            password = base64.b64decode(lines[1].strip(), validate=True).decode('UTF-8')
+        except (binascii.Error, UnicodeDecodeError) as e:
+            log_message(f"Invalid credentials file '{filepath}': {e}")
+            sys.exit(1)
+        return user, password
     return None, None
 
+# authenticated SSH transports shared by every command of the scripts, (instance, user) -> paramiko.Transport; every
+# command runs in its own session channel multiplexed over the transport
+SSH_POOL = {}
+SSH_POOL_LOCK = threading.Lock()
+SSH_PORT = 22
+SSH_CONNECT_TIMEOUT = 30
+# keepalive packets stop firewalls from dropping an idle transport while the scripts work on the NetWorker side
+SSH_KEEPALIVE_SECONDS = 30
+# channel window and packet sizes advertised to the OpenSystem: the pool listings and filesys report arrive in
+# fewer, larger packets, so paramiko runs its per-packet Python code less often
+SSH_WINDOW_SIZE = 16 * 1024 * 1024
+SSH_MAX_PACKET_SIZE = 256 * 1024
+# sessions open at once per transport, below the default sshd MaxSessions (10); further commands wait for a free
+# session. This is the only limit on the SSH channels of the scripts
+SSH_MAX_SESSIONS = 8
+SSH_SESSION_SLOTS = {}
+# bytes read from a channel at once, and the longest wait for more data before checking the command has exited
+SSH_RECV_SIZE = 65536
+SSH_RECV_WAIT_SECONDS = 1
+
+def get_ssh_transport(instance, user, password):
+    """
+    Returns the pooled SSH transport to an OpenSystem instance, connecting and authenticating on first use.
+
+    Method: get_ssh_transport
+    Required: instance (str), user (str), password (str) - The OpenSystem and its credentials
+    Returns: paramiko.Transport
+
+    - A pooled transport that is no longer active is closed and replaced by a new one.
+    - The transport sends keepalives and advertises SSH_WINDOW_SIZE / SSH_MAX_PACKET_SIZE for its channels.
+    """
+    key = (instance, user)
+    with SSH_POOL_LOCK:
+        transport = SSH_POOL.get(key)
+        if transport is not None and not transport.is_active():
+            # the connection was dropped, reconnect instead of failing every remaining command
+            log_message(f"SSH connection to {instance} lost, reconnecting...")
+            transport.close()
+            transport = None
+
+        if transport is None:
+            # paramiko pulls in the cryptography stack, only pay for it once a connection is needed
+            import paramiko
+
+            transport = paramiko.Transport((instance, SSH_PORT))
+            transport.banner_timeout = SSH_CONNECT_TIMEOUT
+            transport.default_window_size = SSH_WINDOW_SIZE
+            transport.default_max_packet_size = SSH_MAX_PACKET_SIZE
+            try:
+                transport.start_client(timeout=SSH_CONNECT_TIMEOUT)
+                transport.auth_password(user, password)
+            except Exception:
+                transport.close()
+                raise
+            transport.set_keepalive(SSH_KEEPALIVE_SECONDS)
+            SSH_POOL[key] = transport
+            SSH_SESSION_SLOTS.setdefault(key, threading.BoundedSemaphore(SSH_MAX_SESSIONS))
+        return transport
+
+def drop_ssh_transport(instance, user):
+    """
+    Closes and forgets the pooled SSH transport to an OpenSystem instance.
+
+    Method: drop_ssh_transport
+    Required: instance (str), user (str)
+    Returns: None
+    """
+    with SSH_POOL_LOCK:
+        transport = SSH_POOL.pop((instance, user), None)
+    if transport is not None:
+        transport.close()
+
+@atexit.register
+def close_ssh_transports():
+    """
+    Closes every pooled SSH transport; also runs at interpreter exit.
+
+    Method: close_ssh_transports
+    Required: None
+    Returns: None
+    """
+    with SSH_POOL_LOCK:
+        transports = list(SSH_POOL.values())
+        SSH_POOL.clear()
+    for transport in transports:
+        transport.close()
+
+def open_ssh_session(instance, user, password):
+    """
+    Opens a session channel on the pooled SSH transport to an OpenSystem instance.
+
+    Method: open_ssh_session
+    Required: instance (str), user (str), password (str) - The OpenSystem and its credentials
+    Returns: paramiko.Channel
+
+    - If no channel can be opened because the pooled transport was dropped, reconnects and tries once more. A
+      transport that is still active is kept, the other threads have channels open on it.
+    """
+    transport = get_ssh_transport(instance, user, password)
+    try:
+        return transport.open_session()
+    except Exception:
+        if transport.is_active():
+            raise
+        return get_ssh_transport(instance, user, password).open_session()
+
+def iter_ssh_channel(channel, error):
+    """
+    Yields the output of a command as it arrives, until the command has exited.
+
+    Method: iter_ssh_channel
+    Required: channel (paramiko.Channel) - The session channel the command was started on
+              error (bytearray) - Receives the error output of the command
+    Returns: Generator of bytes (the output chunks, in order)
+
+    - Drains the error output in the same loop, so a command writing a lot of error output cannot stall while its
+      output is read.
+    - Waits on the channel with select between reads instead of polling.
+    """
+    while True:
+        if channel.recv_ready():
+            yield channel.recv(SSH_RECV_SIZE)
+        elif channel.recv_stderr_ready():
+            error += channel.recv_stderr(SSH_RECV_SIZE)
+        elif channel.exit_status_ready() or channel.closed:
+            # the exit status is sent after the last data, so everything is buffered by now; data that arrived
+            # together with the exit status after the checks above is still unread, drain both streams first
+            while channel.recv_ready() or channel.recv_stderr_ready():
+                if channel.recv_ready():
+                    yield channel.recv(SSH_RECV_SIZE)
+                if channel.recv_stderr_ready():
+                    error += channel.recv_stderr(SSH_RECV_SIZE)
+            return
+        else:
+            select.select([channel], [], [], SSH_RECV_WAIT_SECONDS)
+
+def read_ssh_channel(channel):
+    """
+    Reads the output and error output of a command until it has exited.
+
+    Method: read_ssh_channel
+    Required: channel (paramiko.Channel) - The session channel the command was started on
+    Returns: tuple (bytes, bytes) - The output and error output of the command
+
+    - Collects each stream in one bytearray, so the output is decoded once by the caller.
+    """
+    output, error = bytearray(), bytearray()
+    for chunk in iter_ssh_channel(channel, error):
+        output += chunk
+    return bytes(output), bytes(error)
+
 def execute_ssh_command(command, instance, user, password):
     """
     Executes an SSH command on a remote server.
@@ -170,33 +639,149 @@ def execute_ssh_command(command, instance, user, password):
     Required: command (str) - The SSH command to execute
     Returns: str or bool
 
-    - Connects to the remote server using SSH with the provided credentials.
-    - Executes the given command and returns the output if successful.
-    - Logs any errors encountered during the execution.
+    - Runs the command in a new session channel of the pooled transport to the server, connecting with the provided
+      credentials on first use, and closes only the channel afterwards.
+    - At most SSH_MAX_SESSIONS commands run at once per transport; further calls wait for a free session.
+    - Returns the output if successful, logs any errors encountered during the execution.
     """
     try:
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(instance, username=user, password=password)
+        # make sure the transport and its session slots exist before waiting for a slot
+        get_ssh_transport(instance, user, password)
+        with SSH_SESSION_SLOTS[(instance, user)]:
+            channel = open_ssh_session(instance, user, password)
+            try:
+                channel.exec_command(command)
+                output, error = read_ssh_channel(channel)
+                output = output.decode().strip()
+                error = error.decode().strip()
+            finally:
+                channel.close()
+    except Exception as e:
+        log_message(f"SSH Connection error: {str(e)}")
+        return False
+
+    if error:
+        log_message(f"Error executing '{command}': {error}")
+        return False
+
+    return output
 
-        stdin, stdout, stderr = ssh.exec_command(command)
-        output = stdout.read().decode().strip()
-        error = stderr.read().decode().strip()
+def iter_ssh_command_lines(command, instance, user, password):
+    """
+    Executes an SSH command on a remote server and yields its output line by line.
 
-        ssh.close()
+    Method: iter_ssh_command_lines
+    Required: command (str) - The SSH command to execute
+              instance (str), user (str), password (str) - The OpenSystem and its credentials
+    Returns: Generator of output lines (raises RuntimeError if the command reports an error)
 
-        if error:
-            log_message(f"Error executing '{command}': {error}")
-            return False
+    - Runs in a session channel of the pooled transport like execute_ssh_command, but the lines are yielded while
+      the output is still being received instead of being returned as one string.
+    - Only the incomplete last line of the output received so far is buffered.
+    """
+    error = bytearray()
+    get_ssh_transport(instance, user, password)
+    with SSH_SESSION_SLOTS[(instance, user)]:
+        channel = open_ssh_session(instance, user, password)
+        try:
+            channel.exec_command(command)
+            pending = b""
+            for chunk in iter_ssh_channel(channel, error):
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+                for line in lines:
+                    yield line.decode() + "\n"
+            if pending:
+                yield pending.decode()
+        finally:
+            channel.close()
+
+    error = error.decode().strip()
+    if error:
+        raise RuntimeError(f"Error executing '{command}': {error}")
+
+# interactive shell used by execute_ssh_batch; wide and tall enough that the DD CLI neither wraps nor pages
+SSH_SHELL_WIDTH = 512
+SSH_SHELL_HEIGHT = 4096
+SSH_SHELL_TIMEOUT = 300
+# shape of the DD CLI prompt ("sysadmin@dd9900# ") and the terminal control sequences the PTY may wrap around it
+SSH_SHELL_PROMPT = re.compile(rb"[\w.-]+@[\w.-]+#")
+SSH_SHELL_ESCAPES = re.compile(rb"\x1b(?:\[[0-?]*[ -/]*[@-~]|\][^\x07\x1b]*(?:\x07|\x1b\\)|[()][0-9A-Za-z]|[=>])|\r")
+
+def read_ssh_shell(channel, prompt=None):
+    """
+    Reads from an interactive shell channel until a DD CLI prompt is printed.
 
-        return output
+    Method: read_ssh_shell
+    Required: channel (paramiko.Channel) - The interactive shell channel
+              prompt (bytes) - The DD CLI prompt that ends the output of a command
+    Returns: tuple (bytes output read before the prompt, bytes prompt), escape sequences and carriage returns removed
 
+    - Without a prompt, reads until the last line has the shape of a DD CLI prompt (SSH_SHELL_PROMPT), e.g. after
+      the login banner.
+    - Only the last buffered line is cleaned and checked per read; the whole output is cleaned once at the end.
+    """
+    buffer = bytearray()
+    while True:
+        data = channel.recv(65535)
+        if not data:
+            raise EOFError("Shell channel closed by the OpenSystem")
+        buffer += data
+
+        last_line = SSH_SHELL_ESCAPES.sub(b"", buffer[buffer.rfind(b"\n") + 1:]).strip()
+        if (last_line == prompt) if prompt is not None else SSH_SHELL_PROMPT.fullmatch(last_line):
+            output = SSH_SHELL_ESCAPES.sub(b"", buffer[:buffer.rfind(b"\n") + 1])
+            return bytes(output), last_line
+
+def execute_ssh_batch(commands, instance, user, password):
+    """
+    Executes several SSH commands back to back in one interactive shell channel.
+
+    Method: execute_ssh_batch
+    Required: commands (list of str) - The SSH commands to execute, in order
+              instance (str), user (str), password (str) - The OpenSystem and its credentials
+    Returns: list of str or bool (the output of every command, False for the commands that could not be run)
+
+    - Opens a single channel on the pooled transport for the whole batch instead of one per command.
+    - The DD CLI has no command separator or echo, so the CLI prompt printed after each command is used as the
+      end-of-output marker.
+    - The prompt is taken from the first line after the login banner that looks like a DD CLI prompt, and only used
+      once an empty line has brought the very same prompt back.
+    """
+    outputs = []
+    try:
+        get_ssh_transport(instance, user, password)
+        with SSH_SESSION_SLOTS[(instance, user)]:
+            channel = open_ssh_session(instance, user, password)
+            try:
+                channel.settimeout(SSH_SHELL_TIMEOUT)
+                channel.get_pty(width=SSH_SHELL_WIDTH, height=SSH_SHELL_HEIGHT)
+                channel.invoke_shell()
+                _, prompt = read_ssh_shell(channel)
+                channel.sendall("\n")
+                _, confirmed = read_ssh_shell(channel)
+                if confirmed != prompt:
+                    raise EOFError(f"DD CLI prompt not confirmed: {prompt!r} then {confirmed!r}")
+
+                for command in commands:
+                    channel.sendall(command + "\n")
+                    output = read_ssh_shell(channel, prompt)[0].decode(errors="replace")
+                    # drop the echoed command line
+                    outputs.append(output.split("\n", 1)[1].strip() if "\n" in output else "")
+            finally:
+                channel.close()
     except Exception as e:
+        # only this batch failed, the transport is shared with the other batches and replaced once it is inactive
         log_message(f"SSH Connection error: {str(e)}")
-        return False
 
+    return outputs + [False] * (len(commands) - len(outputs))
 
 
+
+# bytes per size unit of the DD CLI and the input parameters (upper case)
+SIZE_UNITS = {'B': 1, 'KB': 1 << 10, 'KIB': 1 << 10, 'MB': 1 << 20, 'MIB': 1 << 20, 'GB': 1 << 30, 'GIB': 1 << 30,
+              'TB': 1 << 40, 'TIB': 1 << 40}
+
 def size_to_bytes(size_str):
     """
     Method: size_to_bytes
@@ -204,83 +789,195 @@ def size_to_bytes(size_str):
     Required: size_str (string representing the size with a unit)
     Returns: Integer representing the size in bytes
     """
-    size_str = size_str.strip()
     size_value, size_unit = size_str.split()
-    size_value = float(size_value)
-
-    size_unit = size_unit.upper()
-    if size_unit == 'B':
-        return size_value
-    elif size_unit == 'KB':
-        return size_value * 1024
-    elif size_unit == 'MB' or size_unit == 'MIB':
-        return size_value * 1024 * 1024
-    elif size_unit == 'GB' or size_unit == 'GIB':
-        return size_value * 1024 * 1024 * 1024
-    elif size_unit == 'TB' or size_unit == 'TIB':
-        return size_value * 1024 * 1024 * 1024 * 1024
-    else:
-        raise ValueError(f"Unsupported unit: {size_unit}")
-
-def filter_result(pool_data, tape_list_result):
-    tape_list = []
     try:
-        for line in pool_data.split("\n"):
-
-            line = line.split('  ')
-
-            if line[0].strip() == '':
-                continue
-            # print(line)
-            # Check if any element in the array contains a dash '-'
-            # remove_dash = any('-' in item for item in line)
-
-            # if remove_dash:
-            #    continue
-
-            # print(line)
-            # Check if any element in the array contains a dash 'Barcode'
-            # remove_heading = True if line[0].strip() in heading else False
-            remove_heading = set(line) & set(heading)
-
-            if remove_heading:
-                continue
-
-            if len(line) < 2:
-                continue
-            # print(line)
-            tapes = []
-
-            for tape_data in line:
-                tape_data = tape_data.strip()
-                if tape_data:
-                    tapes.append(tape_data)
-
-            if len(tapes) == 8:
-                if tapes[0].strip() in tape_list_result:
-                    tape_info = {
-                        "barcode": tapes[0],
-                        "pool_name": tapes[1],
-                        "location": tapes[2],
-                        "state": tapes[3],
-                        "size": tapes[4],
-                        "used": tapes[5],
-                        "modification_time": tapes[7]
-                    }
-                    tape_list.append(tape_info)
-    except Exception as e:
-        log_message(str(e))
+        multiplier = SIZE_UNITS[size_unit.upper()]
+    except KeyError:
+        raise ValueError(f"Unsupported unit: {size_unit.upper()}") from None
+    return int(float(size_value) * multiplier)
+
+@dataclass(slots=True)
+class TapeInfo:
+    """
+    Class: TapeInfo
+    Description: One tape row of the "vtl tape show" output. Slots keep the per-tape memory small and make
+                 the field access of the per-tape checks cheaper than dictionary lookups.
+    """
+    barcode: str
+    pool_name: str
+    location: str
+    state: str
+    size: str
+    used: str
+    modification_time: str
+
+    @classmethod
+    def from_columns(cls, tapes):
+        """
+        Method: from_columns
+        Description: This method builds a TapeInfo from the 8 column values of a tape row (the Comp column is dropped).
+        Required: tapes (list of column values returned by split_columns)
+        Returns: TapeInfo object
+        """
+        return cls(tapes[0], tapes[1], tapes[2], tapes[3], tapes[4], tapes[5], tapes[7])
+
+    def to_dict(self):
+        """
+        Method: to_dict
+        Description: This method returns the tape information as a dictionary, for JSON logging and reports.
+        Required: None
+        Returns: Dictionary of the tape information
+        """
+        return asdict(self)
+
+@dataclass(slots=True)
+class RetentionTapeInfo:
+    """
+    Class: RetentionTapeInfo
+    Description: One tape row of the "vtl tape show ... time-display retention" output, where the last column holds
+                 the retention time instead of the modification time.
+    """
+    barcode: str
+    pool_name: str
+    location: str
+    state: str
+    size: str
+    retention_time: str
+
+    @classmethod
+    def from_columns(cls, tapes):
+        """
+        Method: from_columns
+        Description: This method builds a RetentionTapeInfo from the 8 column values of a tape row (the Used and
+                     Comp columns are dropped).
+        Required: tapes (list of column values returned by split_columns)
+        Returns: RetentionTapeInfo object
+        """
+        return cls(tapes[0], tapes[1], tapes[2], tapes[3], tapes[4], tapes[7])
+
+    def to_dict(self):
+        """
+        Method: to_dict
+        Description: This method returns the tape information as a dictionary, for JSON logging.
+        Required: None
+        Returns: Dictionary of the tape information
+        """
+        return asdict(self)
+
+def tapes_to_json(tapes):
+    """
+    Method: tapes_to_json
+    Description: This method serializes a list of TapeInfo (or RetentionTapeInfo) objects for reports and debug
+                 logging. Each object is converted to a dictionary only while it is being written, so the tape lists
+                 themselves never hold a dictionary per tape.
+    Required: tapes (list of TapeInfo or RetentionTapeInfo objects)
+    Returns: String (JSON array of the tape information, indented by 4)
+    """
+    return json.dumps(tapes, indent=4, default=asdict)
+
+def split_columns(line):
+    """
+    Method: split_columns
+    Description: This method splits one line of DD CLI table output into its stripped, non-empty column values.
+    Required: line (string representing one line of the command output)
+    Returns: List of column values
+    """
+    return [column for column in COLUMN_SEPARATOR.split(line.strip()) if column]
 
-    return tape_list
+def is_tape_row(tapes):
+    """
+    Method: is_tape_row
+    Description: This method tells a tape row apart from the heading and dash separator lines that also match
+                 TAPE_ROW_RE, with one frozenset lookup and one prefix test on the first column.
+    Required: tapes (tuple of column values matched by TAPE_ROW_RE)
+    Returns: Boolean (True for a tape row, False for a heading or separator line)
+    """
+    return tapes[0] not in TAPE_HEADINGS and not tapes[0].startswith('-')
 
+def iter_tape_rows(output):
+    """
+    Method: iter_tape_rows
+    Description: This method yields the 8 column values of every tape row of "vtl tape show" output, scanning the
+                 whole output with TAPE_ROW_RE in one pass and skipping the heading and dash separator lines.
+    Required: output (string returned by the "vtl tape show" command)
+    Returns: Generator of tuples of column values
+    """
+    for match in TAPE_ROW_RE.finditer(output):
+        tapes = match.groups()
+        if is_tape_row(tapes):
+            yield tapes
+
+def iter_tape_lines(lines):
+    """
+    Method: iter_tape_lines
+    Description: This method yields the 8 column values of every tape row while "vtl tape show" output is still being
+                 read line by line, matching each line against TAPE_ROW_RE and skipping the heading and dash
+                 separator lines, so the full output never has to be held in memory.
+    Required: lines (iterable of output lines, e.g. the stdout of an SSH command)
+    Returns: Generator of tuples of column values
+    """
+    for line in lines:
+        match = TAPE_ROW_RE.match(line)
+        if match:
+            tapes = match.groups()
+            if is_tape_row(tapes):
+                yield tapes
+
+def is_vtl_available(vtl_status):
+    """
+    Method: is_vtl_available
+    Description: This method checks the "vtl status" output for the enabled, running and licensed flags in one
+                 regex pass; whole words only, so "disabled" or "unlicensed" do not count.
+    Required: vtl_status (string returned by the "vtl status" command)
+    Returns: Boolean (True if the VTL is enabled, running and licensed, False otherwise)
+    """
+    return len(set(VTL_STATUS_FLAGS.findall(vtl_status))) == len(VTL_REQUIRED_FLAGS)
+
+def is_retention_locked(state):
+    """
+    Method: is_retention_locked
+    Description: This method checks whether a VTL tape state (e.g., "RO/RL*") carries one of the RETENTION_LOCK_FLAGS,
+                 comparing whole "/" separated state flags so that a flag merely starting with "RL" does not match.
+    Required: state (string representing the tape state)
+    Returns: Boolean (True if one of the state flags is a Retention Lock flag, False otherwise)
+    """
+    return not RETENTION_LOCK_FLAGS.isdisjoint(state.strip().split("/"))
+
+def tape_time_epoch(time_str, date_only=False):
+    """
+    Method: tape_time_epoch
+    Description: This method converts a VTL tape time string in the fixed "%Y/%m/%d %H:%M:%S" layout
+                 (e.g., "2025/02/16 19:45:48") into a local epoch timestamp by slicing and time.mktime, which is
+                 much faster than strptime and allocates no datetime object.
+    Required: time_str (string representing the tape time), date_only (True for the timestamp of midnight of that day)
+    Returns: Integer epoch timestamp
+    """
+    if date_only:
+        hour = minute = second = 0
+    else:
+        hour, minute, second = int(time_str[11:13]), int(time_str[14:16]), int(time_str[17:19])
+    return int(time.mktime((int(time_str[0:4]), int(time_str[5:7]), int(time_str[8:10]), hour, minute, second,
+                            0, 0, -1)))
+
+
+# the nsrmm delete confirmation ("...? ", "(y/n)"); answered with 'y' once it shows up, or after the timeout
+NSRMM_PROMPT = re.compile(rb"\?\s*$|\(y/n\)|\[y/n\]", re.I)
+NSRMM_PROMPT_TIMEOUT = 50
 
 def run_nsrjb_command(command):
+    """
+    Method: run_nsrjb_command
+    Description: This method runs a networker jukebox query command and logs its output.
+    Required: command (list of command arguments to execute)
+    Returns: Boolean (True if the command succeeded, False otherwise)
+
+    - Returns as soon as the command finishes; callers that change the jukebox poll for the new state themselves
+      instead of sleeping a fixed time.
+    """
     try:
         command_string = ' '.join(command)
         log_message(f"Executing command : {command_string}")
         result = subprocess.run(command, capture_output=True, text=True, check=True)
-        # sleep 60 seconds to refresh the tape on networker
-        time.sleep(60)
         log_message(f"Command output:\n {str(result.stdout)}")
         return True
     except subprocess.CalledProcessError as e:
@@ -288,31 +985,54 @@ def run_nsrjb_command(command):
         return False
 
 
-def run_nsrmm_command(command):
+def run_nsrmm_command(command, errors=None):
+    """
+    Method: run_nsrmm_command
+    Description: This method runs a networker media database delete command and confirms it with 'y' as soon as the
+                 command asks for it, instead of after a fixed wait.
+    Required: command (list of command arguments to execute), errors (optional list that receives the error output
+              lines of the command, so the caller can tell which volumes nsrmm rejected)
+    Returns: Boolean (True unless the command could not be run)
+
+    - Watches stdout and stderr of the command for the confirmation prompt for at most NSRMM_PROMPT_TIMEOUT seconds;
+      a command started with -y finishes without asking.
+    - If the command is still running without having asked when the timeout expires, answers 'y' anyway.
+    """
     try:
         command_string = ' '.join(command)
         log_message(f"Networker: Executing delete command : {command_string}")
         log_message("Deleting inprogress")
 
-        # Start the process without input first
-        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                                   text=True)
-
-        # Wait for 50 seconds before sending the input 'y'
-        time.sleep(50)
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        output = {process.stdout: b"", process.stderr: b""}
+        open_streams = [process.stdout, process.stderr]
+        deadline = time.monotonic() + NSRMM_PROMPT_TIMEOUT
+        prompted = False
+        while open_streams and not prompted and time.monotonic() < deadline:
+            ready, _, _ = select.select(open_streams, [], [], min(1.0, max(0.0, deadline - time.monotonic())))
+            for stream in ready:
+                chunk = os.read(stream.fileno(), 4096)
+                if not chunk:
+                    open_streams.remove(stream)
+                    continue
+                output[stream] += chunk
+                if NSRMM_PROMPT.search(output[stream]):
+                    prompted = True
 
         # Check if the process is still alive before attempting to write
         if process.poll() is None:  # process is still running
-            process.stdin.write('y\n')
-            process.stdin.flush()
-
-            # Capture the output after the input is sent
-            stdout, stderr = process.communicate()
-
-            if stderr:
-                log_message(f"Error occurred while deleting volume:\n{stderr}")
+            stdout, stderr = process.communicate(b"y\n")
         else:
-            log_message("Process terminated before sending input.")
+            stdout, stderr = process.communicate()
+            if not prompted and '-y' not in command:
+                log_message("Process terminated before sending input.")
+
+        stderr = (output[process.stderr] + stderr).decode(errors="replace").strip()
+        if stderr:
+            log_message(f"Error occurred while deleting volume:\n{stderr}")
+            if errors is not None:
+                errors.extend(stderr.splitlines())
 
         return True
 